@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 from river.drift.binary import DDM
 from river.drift import ADWIN
@@ -13,6 +15,10 @@ from optimization.parameter import Parameter
 
 
 N_SAMPLES = 1_000_000
+CACHE_DIR = ".cache"
+RESULTS_DIR = ".results"
+WORKERS = os.cpu_count()
+FAN_OUT = True
 
 
 class D3Configuration:
@@ -0,0 +1,303 @@
+"""This module provides memory-mapped caches of data streams on disk."""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+CACHE_VERSION = 1
+
+
+class MaterializedStream:
+    """
+    A data stream replayed from features and drift labels stored on disk. The arrays are memory-mapped, so replaying
+    the stream does not copy the data and multiple processes can share the same file.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Init a new MaterializedStream from the given cache directory.
+
+        :param directory: the directory containing the cached stream
+        """
+        self.directory = directory
+        arrays, self.metadata = load_arrays(directory)
+        self.features = arrays["features"]
+        self.drifts = arrays["drifts"]
+        self.name = self.metadata["name"]
+
+    # every iteration replays the same data
+    replays = True
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def __iter__(self):
+        """
+        Replay the data stream observation by observation.
+        """
+        for x, drift in zip(self.features, self.drifts):
+            yield x, None, bool(drift)
+
+    def iter_blocks(self, block_size: int):
+        """
+        Replay the data stream in blocks of views into the memory-mapped arrays.
+
+        :param block_size: the number of observations per block, only the last block may be shorter
+        :return: tuples containing the features with shape (block_size, n_features) and the drift labels
+        """
+        for start in range(0, len(self.features), block_size):
+            yield (
+                self.features[start : start + block_size],
+                self.drifts[start : start + block_size],
+            )
+
+    def fingerprint(self) -> str:
+        """
+        Get the fingerprint of the stream this cache was created from.
+
+        :return: the fingerprint
+        """
+        return self.metadata["fingerprint"]
+
+    def __getstate__(self):
+        # only the directory is pickled, the arrays are memory-mapped again after unpickling
+        return {"directory": self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+
+
+def materialize(
+    stream, cache_dir: str, block_size: int = 100_000, workers: int = 1
+) -> MaterializedStream:
+    """
+    Materialize the given stream in the cache directory unless it was materialized before. The cache is keyed by the
+    stream's fingerprint, hence the stream is materialized from its initial state, regardless of previous iterations.
+
+    :param stream: the stream, must provide describe, fingerprint, reset and iter_blocks
+    :param cache_dir: the cache directory
+    :param block_size: the number of observations generated at once
+    :param workers: the number of processes generating chunks in parallel, only used for streams in counter mode
+    :return: the materialized stream
+    """
+    if _contains_none_seed(stream.describe()):
+        raise ValueError("Only streams with fixed seeds can be materialized")
+    directory = path.join(cache_dir, stream.fingerprint())
+    if not path.exists(directory):
+        fresh_stream = copy.deepcopy(stream)
+        fresh_stream.reset()
+        if workers > 1 and getattr(stream, "rng_mode", None) == "counter":
+            _materialize_parallel(fresh_stream, directory, block_size, workers)
+        else:
+            features = []
+            drifts = []
+            for block_features, block_drifts in fresh_stream.iter_blocks(block_size):
+                features.append(block_features)
+                drifts.append(block_drifts)
+            features = np.concatenate(features)
+            save_arrays(
+                directory,
+                {"features": features, "drifts": np.concatenate(drifts)},
+                _get_metadata(stream, features.shape),
+            )
+    return MaterializedStream(directory)
+
+
+def _materialize_parallel(stream, directory: str, block_size: int, workers: int):
+    """
+    Materialize a stream in counter mode by generating its chunks in parallel processes, which write directly into the
+    preallocated files.
+
+    :param stream: the stream in its initial state
+    :param directory: the cache directory of the stream
+    :param block_size: the number of observations per chunk
+    :param workers: the number of processes
+    """
+    n_samples = stream.get_n_samples()
+    n_features = len(stream.concepts[0].features)
+    temporary_directory = _make_temporary_directory(directory)
+    features = open_memmap(
+        path.join(temporary_directory, "features.npy"),
+        mode="w+",
+        shape=(n_samples, n_features),
+    )
+    drifts = open_memmap(
+        path.join(temporary_directory, "drifts.npy"),
+        mode="w+",
+        dtype=bool,
+        shape=(n_samples,),
+    )
+    del features, drifts
+    starts = range(0, n_samples, block_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(
+            executor.map(
+                _write_chunk,
+                [stream] * len(starts),
+                [temporary_directory] * len(starts),
+                starts,
+                [min(start + block_size, n_samples) for start in starts],
+            )
+        )
+    _write_metadata(temporary_directory, _get_metadata(stream, (n_samples, n_features)))
+    _commit_directory(temporary_directory, directory)
+
+
+def _write_chunk(stream, directory: str, start: int, stop: int):
+    """
+    Generate the observations with indices in [start, stop) and write them into the files in the given directory.
+
+    :param stream: the stream in counter mode
+    :param directory: the directory containing the preallocated files
+    :param start: the index of the first observation
+    :param stop: the index after the last observation
+    """
+    features, drifts = stream.generate(start, stop)
+    features_file = np.load(path.join(directory, "features.npy"), mmap_mode="r+")
+    drifts_file = np.load(path.join(directory, "drifts.npy"), mmap_mode="r+")
+    features_file[start:stop] = features
+    drifts_file[start:stop] = drifts
+    features_file.flush()
+    drifts_file.flush()
+
+
+def _get_metadata(stream, shape: tuple[int, int]) -> dict:
+    """
+    Get the metadata of a materialized stream.
+
+    :param stream: the stream
+    :param shape: the shape of the feature matrix
+    :return: the metadata
+    """
+    return {
+        "name": stream.name,
+        "fingerprint": stream.fingerprint(),
+        "description": stream.describe(),
+        "n_samples": shape[0],
+        "n_features": shape[1],
+    }
+
+
+def get_fingerprint(description: dict) -> str:
+    """
+    Get a fingerprint of the given description by hashing its canonical JSON representation.
+
+    :param description: the description
+    :return: the hexadecimal fingerprint
+    """
+    canonical = json.dumps(
+        {"version": CACHE_VERSION, "description": description},
+        sort_keys=True,
+        default=_to_json,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def save_arrays(directory: str, arrays: dict[str, np.ndarray], metadata: dict):
+    """
+    Save the given arrays as .npy files and the metadata as JSON file in the given directory. The files are written to
+    a temporary directory first, which is renamed afterwards, so concurrent processes never read incomplete caches.
+
+    :param directory: the directory
+    :param arrays: the arrays by name
+    :param metadata: the metadata
+    """
+    temporary_directory = _make_temporary_directory(directory)
+    for name, array in arrays.items():
+        np.save(path.join(temporary_directory, f"{name}.npy"), array)
+    _write_metadata(temporary_directory, metadata)
+    _commit_directory(temporary_directory, directory)
+
+
+def _make_temporary_directory(directory: str) -> str:
+    """
+    Make a temporary directory next to the given directory.
+
+    :param directory: the directory
+    :return: the path of the temporary directory
+    """
+    parent = path.dirname(path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(dir=parent)
+
+
+def _write_metadata(directory: str, metadata: dict):
+    """
+    Write the metadata as JSON file in the given directory.
+
+    :param directory: the directory
+    :param metadata: the metadata
+    """
+    with open(path.join(directory, "metadata.json"), "w") as file:
+        json.dump(metadata, file, default=_to_json)
+
+
+def _commit_directory(temporary_directory: str, directory: str):
+    """
+    Rename the temporary directory to the given directory, unless another process created it in the meantime.
+
+    :param temporary_directory: the temporary directory
+    :param directory: the directory
+    """
+    try:
+        os.rename(temporary_directory, directory)
+    except OSError:
+        # another process created the cache in the meantime
+        shutil.rmtree(temporary_directory)
+
+
+def load_arrays(directory: str) -> (dict[str, np.ndarray], dict):
+    """
+    Load the arrays and the metadata saved in the given directory. The arrays are memory-mapped read-only.
+
+    :param directory: the directory
+    :return: a tuple containing the arrays by name and the metadata
+    """
+    arrays = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(".npy"):
+            arrays[filename[: -len(".npy")]] = np.load(
+                path.join(directory, filename), mmap_mode="r"
+            )
+    with open(path.join(directory, "metadata.json")) as file:
+        metadata = json.load(file)
+    return arrays, metadata
+
+
+def _contains_none_seed(description) -> bool:
+    """
+    Check if any seed in the given description is None.
+
+    :param description: the description
+    :return: True if a seed is None, else False
+    """
+    if isinstance(description, dict):
+        return any(
+            (key == "seed" and value is None) or _contains_none_seed(value)
+            for key, value in description.items()
+        )
+    if isinstance(description, list):
+        return any(_contains_none_seed(item) for item in description)
+    return False
+
+
+def _to_json(value):
+    """
+    Convert NumPy scalars and arrays to JSON serializable values.
+
+    :param value: the value
+    :return: the converted value
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
@@ -19,6 +19,21 @@ class Concept:
         """
         self.features = features
 
+    def reset(self):
+        """
+        Reset the features to their initial state.
+        """
+        for feature in self.features:
+            feature.reset()
+
+    def describe(self) -> dict:
+        """
+        Describe the concept by its features.
+
+        :return: the description
+        """
+        return {"features": [feature.describe() for feature in self.features]}
+
     def __iter__(self):
         """
         Iterate over data from the features. Does not terminate unless the features do.
@@ -26,3 +41,13 @@ class Concept:
         for values in zip(*self.features):
             values = np.array(values)
             yield values
+
+    def generate(self, n: int) -> np.ndarray:
+        """
+        Generate n observations at once.
+
+        :param n: the number of observations
+        :return: the observations with shape (n, n_features)
+        """
+        values = [feature.generate(n) for feature in self.features]
+        return np.column_stack(values).reshape(n, len(self.features))
@@ -24,8 +24,28 @@ class Transition(ABC):
         """
         self.min_length = min_length
         self.max_length = max_length
+        self.seed = seed
         self.rng = np.random.default_rng(seed)
 
+    def reset(self):
+        """
+        Reset the random number generator to its initial state.
+        """
+        self.rng = np.random.default_rng(self.seed)
+
+    def describe(self) -> dict:
+        """
+        Describe the transition by its type and parameters.
+
+        :return: the description
+        """
+        return {
+            "type": type(self).__name__,
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "seed": self.seed,
+        }
+
     @abstractmethod
     def __iter__(self):
         """
@@ -35,6 +55,15 @@ class Transition(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def generate(self, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Generate the transition factors of a transition at once.
+
+        Abstract method, must be implemented by inheriting class.
+        """
+        raise NotImplementedError
+
 
 class LinearTransition(Transition):
     """
@@ -45,12 +74,22 @@ class LinearTransition(Transition):
         """
         Iterate over the transition factors
         """
-        length = self.rng.integers(self.min_length, self.max_length + 1)
+        yield from self.generate()
+
+    def generate(self, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Generate the transition factors of a transition with random length.
+
+        :param rng: the random number generator, defaults to the generator of the transition
+        :return: the transition factors
+        """
+        if rng is None:
+            rng = self.rng
+        length = rng.integers(self.min_length, self.max_length + 1)
         # we use length + 2 because 0 and 1 are included in the output of this linspace
         transition_factors = np.linspace(0, 1, length + 2)
         # remove leading 0 and trailing 1 from transition factors
-        transition_factors = transition_factors[1:-1]
-        yield from transition_factors
+        return transition_factors[1:-1]
 
 
 class ConceptDrift(ABC, Iterable):
@@ -77,6 +116,21 @@ class ConceptDrift(ABC, Iterable):
         self.old_concept = old_concept
         self.new_concept = new_concept
 
+    def reset(self):
+        """
+        Reset the concept drift to its initial state.
+        """
+        self.old_concept = None
+        self.new_concept = None
+
+    def describe(self) -> dict:
+        """
+        Describe the concept drift by its type and parameters.
+
+        :return: the description
+        """
+        return {"type": type(self).__name__}
+
     @abstractmethod
     def __iter__(self):
         """
@@ -86,6 +140,43 @@ class ConceptDrift(ABC, Iterable):
         """
         raise NotImplementedError("Must implement __iter__")
 
+    @abstractmethod
+    def generate(self) -> np.ndarray:
+        """
+        Generate the data during the concept drift at once.
+
+        Must be implemented in inheriting class.
+        """
+        raise NotImplementedError("Must implement generate")
+
+    @abstractmethod
+    def get_transition_factors(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Get the weights of the new concept for each observation of a concept drift.
+
+        Must be implemented in inheriting class.
+        """
+        raise NotImplementedError("Must implement get_transition_factors")
+
+    def blend(
+        self,
+        transition_factors: np.ndarray,
+        old_features: np.ndarray,
+        new_features: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Blend observations of the old and new concept according to the given transition factors.
+
+        :param transition_factors: the weights of the new concept
+        :param old_features: the observations of the old concept with shape (n, n_features)
+        :param new_features: the observations of the new concept with shape (n, n_features)
+        :return: the observations during the concept drift
+        """
+        transition_factors = transition_factors[:, None]
+        return (
+            old_features * (1 - transition_factors) + new_features * transition_factors
+        )
+
 
 class AbruptDrift(ConceptDrift):
     """
@@ -93,7 +184,32 @@ class AbruptDrift(ConceptDrift):
     """
 
     def __iter__(self):
-        yield next(iter(self.new_concept))
+        yield from self.generate()
+
+    def generate(self) -> np.ndarray:
+        """
+        Generate a single observation of the new concept.
+
+        :return: the observation with shape (1, n_features)
+        """
+        return self.new_concept.generate(1)
+
+    def get_transition_factors(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Get the weights of the new concept, an abrupt drift consists of a single observation of the new concept.
+
+        :param rng: the random number generator, unused
+        :return: the transition factors
+        """
+        return np.ones(1)
+
+    def blend(
+        self,
+        transition_factors: np.ndarray,
+        old_features: np.ndarray,
+        new_features: np.ndarray,
+    ) -> np.ndarray:
+        return new_features
 
 
 class IncrementalDrift(ConceptDrift):
@@ -113,6 +229,23 @@ class IncrementalDrift(ConceptDrift):
         super().__init__()
         self.transition = transition
 
+    def reset(self):
+        """
+        Reset the concept drift and its transition to their initial state.
+        """
+        super().reset()
+        self.transition.reset()
+
+    def describe(self) -> dict:
+        """
+        Describe the concept drift by its type and transition.
+
+        :return: the description
+        """
+        description = super().describe()
+        description["transition"] = self.transition.describe()
+        return description
+
     @staticmethod
     def _get_features(transition_factor: float, old_features: np.ndarray, new_features: np.ndarray) -> np.ndarray:
         """
@@ -135,3 +268,25 @@ class IncrementalDrift(ConceptDrift):
         ):
             features = self._get_features(factor, old_features, new_features)
             yield features
+
+    def generate(self) -> np.ndarray:
+        """
+        Generate the data during the concept drift at once by blending whole blocks of both concepts.
+
+        :return: the observations with shape (transition length, n_features)
+        """
+        transition_factors = self.transition.generate()
+        old_features = self.old_concept.generate(len(transition_factors))
+        new_features = self.new_concept.generate(len(transition_factors))
+        return self._get_features(
+            transition_factors[:, None], old_features, new_features
+        )
+
+    def get_transition_factors(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Get the weights of the new concept drawn from the transition.
+
+        :param rng: the random number generator
+        :return: the transition factors
+        """
+        return self.transition.generate(rng)
@@ -24,12 +24,36 @@ class Feature(ABC):
         """
         self.min = min_
         self.max = max_
+        self.seed = seed
         self.rng = np.random.default_rng(seed=seed)
 
+    def reset(self):
+        """
+        Reset the random number generator to its initial state.
+        """
+        self.rng = np.random.default_rng(seed=self.seed)
+
+    def describe(self) -> dict:
+        """
+        Describe the feature by its type and parameters.
+
+        :return: the description
+        """
+        return {
+            "type": type(self).__name__,
+            "min": self.min,
+            "max": self.max,
+            "seed": self.seed,
+        }
+
     @abstractmethod
     def __iter__(self):
         raise NotImplementedError()
 
+    @abstractmethod
+    def generate(self, n: int, rng: np.random.Generator = None) -> np.ndarray:
+        raise NotImplementedError()
+
 
 class UniformFeature(Feature):
     """
@@ -45,3 +69,15 @@ class UniformFeature(Feature):
         while True:
             value = self.rng.uniform(self.min, self.max)
             yield value
+
+    def generate(self, n: int, rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Generate n values at once. Yields the same values as n iterations.
+
+        :param n: the number of values
+        :param rng: the random number generator, defaults to the generator of the feature
+        :return: an array of uniformly distributed values
+        """
+        if rng is None:
+            rng = self.rng
+        return rng.uniform(self.min, self.max, size=n)
@@ -0,0 +1,182 @@
+"""This module provides file datasets replayed from a columnar cache."""
+
+import csv
+import os
+from os import path
+from typing import Optional
+
+import numpy as np
+from river.datasets import base
+
+from data.cache import get_fingerprint, load_arrays, save_arrays
+
+
+class CachedFileDataset(base.FileDataset):
+    """
+    A dataset stored in a CSV file with a header, a target column and known drift positions. On first use, the CSV
+    file is parsed once into a columnar cache of NumPy files, which contains the feature matrix, the encoded labels and
+    the drift indices. All iterations replay the memory-mapped cache instead of parsing the CSV file again.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        directory_path: str,
+        drifts: list[int],
+        target: str = "class",
+        name: str = "",
+        cache_dir: Optional[str] = None,
+        output: str = "dict",
+        **desc,
+    ):
+        """
+        Init a new CachedFileDataset instance.
+
+        :param filename: the name of the csv file
+        :param directory_path: the directory containing the csv file
+        :param drifts: the indices of the observations at which a concept drift occurs
+        :param target: the name of the target column
+        :param name: the name of the dataset to be used in plotting
+        :param cache_dir: the cache directory, defaults to a .cache directory next to the csv file
+        :param output: the type of features yielded by __iter__, either "dict" or "array"
+        :param desc: kwargs passed to river's FileDataset
+        """
+        super().__init__(filename=filename, directory=directory_path, **desc)
+        if output not in ("dict", "array"):
+            raise ValueError(f"Unknown output: {output}")
+        self.name = name
+        self.drifts = drifts
+        self.target = target
+        self.full_path = path.join(directory_path, filename)
+        if cache_dir is None:
+            cache_dir = path.join(directory_path, ".cache")
+        self.cache_dir = cache_dir
+        self.output = output
+        self._arrays = None
+        self._metadata = None
+
+    # every iteration replays the same data
+    replays = True
+
+    def __getstate__(self):
+        # the memory-mapped arrays are loaded again after unpickling instead of being copied into the pickle
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        state["_metadata"] = None
+        return state
+
+    def describe(self) -> dict:
+        """
+        Describe the dataset by its file, target and drifts. The size and modification time of the file are included,
+        so a modified file invalidates the cache.
+
+        :return: the description
+        """
+        stat = os.stat(self.full_path)
+        return {
+            "type": type(self).__name__,
+            "filename": self.filename,
+            "size": stat.st_size,
+            "modified": stat.st_mtime_ns,
+            "target": self.target,
+            "drifts": list(self.drifts),
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Get a fingerprint identifying the data of the dataset.
+
+        :return: the fingerprint
+        """
+        return get_fingerprint(self.describe())
+
+    def _load(self) -> (dict[str, np.ndarray], dict):
+        """
+        Load the cache, parse the csv file first if it was not cached before.
+
+        :return: a tuple containing the memory-mapped arrays by name and the metadata
+        """
+        if self._arrays is None:
+            directory = path.join(self.cache_dir, self.fingerprint())
+            if not path.exists(directory):
+                arrays, metadata = self._parse()
+                save_arrays(directory, arrays, metadata)
+            self._arrays, self._metadata = load_arrays(directory)
+        return self._arrays, self._metadata
+
+    def _parse(self) -> (dict[str, np.ndarray], dict):
+        """
+        Parse the csv file into a feature matrix, encoded labels and a drift mask.
+
+        :return: a tuple containing the arrays by name and the metadata
+        """
+        with open(self.full_path, newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            target_index = header.index(self.target)
+            feature_names = [
+                column for i, column in enumerate(header) if i != target_index
+            ]
+            rows = []
+            labels = []
+            for row in reader:
+                labels.append(row.pop(target_index))
+                rows.append(row)
+        classes, encoded_labels = np.unique(labels, return_inverse=True)
+        features = np.array(rows, dtype=float).reshape(len(rows), len(feature_names))
+        drift_mask = np.zeros(len(rows), dtype=bool)
+        drift_indices = np.array(
+            [i for i in self.drifts if i < len(rows)], dtype=np.int64
+        )
+        drift_mask[drift_indices] = True
+        arrays = {
+            "features": features,
+            "labels": encoded_labels,
+            "drifts": drift_mask,
+            "drift_indices": drift_indices,
+        }
+        metadata = {
+            "name": self.name,
+            "fingerprint": self.fingerprint(),
+            "description": self.describe(),
+            "feature_names": feature_names,
+            "classes": classes.tolist(),
+        }
+        return arrays, metadata
+
+    def __iter__(self):
+        """
+        Replay the dataset observation by observation.
+
+        :return: tuples containing the features as dict or array, the label and the drift label
+        """
+        arrays, metadata = self._load()
+        feature_names = metadata["feature_names"]
+        classes = metadata["classes"]
+        # converting chunks to lists avoids indexing the memory-mapped arrays row by row
+        chunk_size = 10_000
+        for start in range(0, len(arrays["features"]), chunk_size):
+            stop = start + chunk_size
+            features = arrays["features"][start:stop]
+            rows = features.tolist() if self.output == "dict" else features
+            labels = arrays["labels"][start:stop].tolist()
+            drifts = arrays["drifts"][start:stop].tolist()
+            for x, label, drift in zip(rows, labels, drifts):
+                if self.output == "dict":
+                    x = dict(zip(feature_names, x))
+                yield x, classes[label], drift
+
+    def iter_blocks(self, block_size: int):
+        """
+        Replay the dataset in blocks of views into the memory-mapped cache.
+
+        :param block_size: the number of observations per block, only the last block may be shorter
+        :return: tuples containing the features with shape (block_size, n_features) and the drift labels
+        """
+        arrays, _ = self._load()
+        features = arrays["features"]
+        drifts = arrays["drifts"]
+        for start in range(0, len(features), block_size):
+            yield features[start : start + block_size], drifts[
+                start : start + block_size
+            ]
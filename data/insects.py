@@ -1,11 +1,10 @@
 """This module provides the INSECTS drifting data streams."""
-from os import path
-
-from river import stream
 from river.datasets import base
 
+from data.file_dataset import CachedFileDataset
+
 
-class InsectsAbruptBalanced(base.FileDataset):
+class InsectsAbruptBalanced(CachedFileDataset):
     """
     This class provides the abrupt balanced INSECTS datastream.
 
@@ -32,28 +31,13 @@ class InsectsAbruptBalanced(base.FileDataset):
                 "n_samples": 52848,
                 "n_features": 33,
                 "task": base.MULTI_CLF,
-                "filename": "INSECTS-abrupt_balanced_norm.csv",
             }
         )
-        super().__init__(**desc)
-        self.name = name
-        self.full_path = ""
-        self.drifts = [14_352, 19_500, 33_240, 38_682, 39_510]
-        self.full_path = path.join(directory_path, self.filename)
-
-    def __iter__(self):
-        converters = {f"Att{i}": float for i in range(1, 34)}
-        converters["class"] = str
-        """return stream.iter_csv(
-            self.full_path,
+        super().__init__(
+            filename="INSECTS-abrupt_balanced_norm.csv",
+            directory_path=directory_path,
+            drifts=[14_352, 19_500, 33_240, 38_682, 39_510],
             target="class",
-            converters=converters,
-        )"""
-        for i, (x, y) in enumerate(
-            stream.iter_csv(
-                self.full_path,
-                target="class",
-                converters=converters,
-            )
-        ):
-            yield x, y, i in self.drifts
+            name=name,
+            **desc,
+        )
@@ -1,11 +1,14 @@
 import time
-from itertools import islice
 
 import numpy as np
 
+from data.cache import get_fingerprint
 from data.concept import Concept
 from data.concept_drift import ConceptDrift
 
+# the number of consecutive values of a feature generated together in counter mode
+PAGE_SIZE = 8192
+
 
 class Stream:
     """
@@ -22,10 +25,18 @@ class Stream:
         min_len: int,
         name: str = None,
         seed=None,
+        rng_mode: str = "sequential",
     ):
         """
         Init a new Stream instance
 
+        In "sequential" mode, the stream, its features and its transition draw from their own sequential generators, so
+        the data can only be generated from the start. In "counter" mode, all random numbers are drawn from counter-based
+        Philox generators with substreams spawned from the seed of the stream for the concept schedule, the transitions
+        and each feature of each concept, and the seeds of the features and transitions are not used. The values of a
+        feature are addressed by the index of the observation, hence any slice of the stream can be generated on its own
+        and chunks generated in parallel are identical to a sequential pass.
+
         :param concepts: the concepts
         :param concept_min_len: the minimum duration of a concept
         :param concept_max_len: the maximum duration of a concept
@@ -33,8 +44,27 @@ class Stream:
         :param min_len: the minimum length of the stream
         :param name: the name of the stream to be used in plotting
         :param seed: the random seed
+        :param rng_mode: the generation mode, either "sequential" or "counter"
         """
+        if rng_mode not in ("sequential", "counter"):
+            raise ValueError(f"Unknown rng mode: {rng_mode}")
         self.seed = seed
+        self.rng_mode = rng_mode
+        # the substreams are spawned once, so an unseeded stream is consistent across slices
+        schedule_sequence, transition_sequence, *concept_sequences = (
+            np.random.SeedSequence(seed).spawn(2 + len(concepts))
+        )
+        self.schedule_sequence = schedule_sequence
+        self.transition_sequence = transition_sequence
+        self.feature_keys = [
+            [
+                feature_sequence.generate_state(2, np.uint64)
+                for feature_sequence in concept_sequence.spawn(len(concept.features))
+            ]
+            for concept, concept_sequence in zip(concepts, concept_sequences)
+        ]
+        self._schedule = None
+        self._pages = {}
         self.rng = np.random.default_rng(seed)
         self.concepts = concepts
         self.active_concept = self.rng.choice(self.concepts, 1)[0]
@@ -44,25 +74,270 @@ class Stream:
         self.min_len = min_len
         self.name = name
 
+    def reset(self):
+        """
+        Reset the stream, its concepts and its concept drift to their initial state, so the stream generates the same
+        data as after initialization.
+        """
+        self.rng = np.random.default_rng(self.seed)
+        self.active_concept = self.rng.choice(self.concepts, 1)[0]
+        for concept in self.concepts:
+            concept.reset()
+        self.concept_drift.reset()
+        self._pages = {}
+
+    @property
+    def replays(self) -> bool:
+        """
+        Check if every iteration yields the same data. In "sequential" mode, an iteration continues where the previous
+        one stopped.
+
+        :return: True in "counter" mode, else False
+        """
+        return self.rng_mode == "counter"
+
+    def describe(self) -> dict:
+        """
+        Describe the stream by its type, parameters, concepts and concept drift. The name is not part of the
+        description, as it does not affect the data.
+
+        :return: the description
+        """
+        return {
+            "type": type(self).__name__,
+            "concepts": [concept.describe() for concept in self.concepts],
+            "concept_min_len": self.concept_min_len,
+            "concept_max_len": self.concept_max_len,
+            "concept_drift": self.concept_drift.describe(),
+            "min_len": self.min_len,
+            "seed": self.seed,
+            "rng_mode": self.rng_mode,
+        }
+
+    def fingerprint(self) -> str:
+        """
+        Get a fingerprint identifying the data generated by the stream after initialization.
+
+        :return: the fingerprint
+        """
+        return get_fingerprint(self.describe())
+
     def __iter__(self):
         """
         Generate data from the concepts and concept drift.
         """
+        if self.rng_mode == "counter":
+            for features, drifts in self.iter_blocks(PAGE_SIZE):
+                yield from zip(features, [None] * len(features), drifts.tolist())
+            return
+        for features, drift in self._iter_segments():
+            for x in features:
+                yield x, None, drift
+
+    def iter_blocks(self, block_size: int):
+        """
+        Generate data from the concepts and concept drift in blocks. Yields the same data as iterating the stream.
+
+        :param block_size: the number of observations per block, only the last block may be shorter
+        :return: tuples containing the features with shape (block_size, n_features) and the drift labels
+        """
+        if self.rng_mode == "counter":
+            n_samples = self.get_n_samples()
+            for start in range(0, n_samples, block_size):
+                yield self.generate(start, min(start + block_size, n_samples))
+            return
+        features = []
+        drifts = []
+        n = 0
+        for segment_features, drift in self._iter_segments():
+            features.append(segment_features)
+            drifts.append(np.full(len(segment_features), drift))
+            n += len(segment_features)
+            if n >= block_size:
+                all_features = np.concatenate(features)
+                all_drifts = np.concatenate(drifts)
+                n_complete = n - n % block_size
+                for start in range(0, n_complete, block_size):
+                    yield (
+                        all_features[start : start + block_size],
+                        all_drifts[start : start + block_size],
+                    )
+                features = [all_features[n_complete:]]
+                drifts = [all_drifts[n_complete:]]
+                n -= n_complete
+        if n > 0:
+            yield np.concatenate(features), np.concatenate(drifts)
+
+    def get_n_samples(self) -> int:
+        """
+        Get the number of observations of the stream. Only available in counter mode.
+
+        :return: the number of observations
+        """
+        return int(self._get_schedule()["stops"][-1])
+
+    def generate(self, start: int, stop: int) -> (np.ndarray, np.ndarray):
+        """
+        Generate the observations with indices in [start, stop) independently of any other observation. Only available
+        in counter mode.
+
+        :param start: the index of the first observation
+        :param stop: the index after the last observation
+        :return: a tuple containing the features with shape (stop - start, n_features) and the drift labels
+        """
+        schedule = self._get_schedule()
+        if not 0 <= start <= stop <= schedule["stops"][-1]:
+            raise ValueError(f"Invalid slice [{start}, {stop}) of the stream")
+        n_features = len(self.concepts[0].features)
+        features = np.empty((stop - start, n_features))
+        drifts = np.zeros(stop - start, dtype=bool)
+        concept_features = {}
+        first = np.searchsorted(schedule["stops"], start, side="right")
+        last = np.searchsorted(schedule["starts"], stop, side="left")
+        for i in range(first, last):
+            segment_start = schedule["starts"][i]
+            low = max(start, segment_start) - start
+            high = min(stop, schedule["stops"][i]) - start
+            for concept in (schedule["concepts"][i], schedule["new_concepts"][i]):
+                if concept >= 0 and concept not in concept_features:
+                    concept_features[concept] = self._generate_concept(
+                        concept, start, stop
+                    )
+            old_features = concept_features[schedule["concepts"][i]][low:high]
+            if schedule["new_concepts"][i] < 0:
+                features[low:high] = old_features
+            else:
+                offset = start - segment_start
+                transition_factors = schedule["transition_factors"][i]
+                features[low:high] = self.concept_drift.blend(
+                    transition_factors[low + offset : high + offset],
+                    old_features,
+                    concept_features[schedule["new_concepts"][i]][low:high],
+                )
+                drifts[low:high] = True
+        return features, drifts
+
+    def _get_schedule(self) -> dict[str, np.ndarray or list]:
+        """
+        Get the schedule of the concepts and concept drifts in counter mode. The schedule is drawn once from its own
+        substream, the transitions from another one.
+
+        :return: the start, stop, active concept, new concept (-1 for stationary segments) and transition factors of
+            each segment
+        """
+        if self.rng_mode != "counter":
+            raise ValueError("Seeking is only available in counter mode")
+        if self._schedule is None:
+            schedule_rng = np.random.Generator(np.random.Philox(self.schedule_sequence))
+            transition_rng = np.random.Generator(
+                np.random.Philox(self.transition_sequence)
+            )
+            starts = []
+            stops = []
+            concepts = []
+            new_concepts = []
+            transition_factors = []
+            active_concept = schedule_rng.integers(len(self.concepts))
+            i = 0
+            while True:
+                concept_len = schedule_rng.integers(
+                    self.concept_min_len, self.concept_max_len + 1
+                )
+                starts.append(i)
+                concepts.append(active_concept)
+                new_concepts.append(-1)
+                transition_factors.append(None)
+                i += concept_len
+                stops.append(i)
+                if i >= self.min_len:
+                    break
+                # draw one of the other concepts
+                new_concept = schedule_rng.integers(len(self.concepts) - 1)
+                new_concept += new_concept >= active_concept
+                factors = self.concept_drift.get_transition_factors(transition_rng)
+                starts.append(i)
+                concepts.append(active_concept)
+                new_concepts.append(new_concept)
+                transition_factors.append(factors)
+                i += len(factors)
+                stops.append(i)
+                active_concept = new_concept
+            self._schedule = {
+                "starts": np.array(starts, dtype=np.int64),
+                "stops": np.array(stops, dtype=np.int64),
+                "concepts": np.array(concepts, dtype=np.int64),
+                "new_concepts": np.array(new_concepts, dtype=np.int64),
+                "transition_factors": transition_factors,
+            }
+        return self._schedule
+
+    def _generate_concept(self, concept: int, start: int, stop: int) -> np.ndarray:
+        """
+        Generate the observations of a concept with indices in [start, stop) in counter mode, whether the concept is
+        active or not.
+
+        :param concept: the index of the concept
+        :param start: the index of the first observation
+        :param stop: the index after the last observation
+        :return: the observations with shape (stop - start, n_features)
+        """
+        features = self.concepts[concept].features
+        first_page = start // PAGE_SIZE
+        offset = start - first_page * PAGE_SIZE
+        values = []
+        for i, feature in enumerate(features):
+            pages = [
+                self._get_page(feature, (concept, i), page)
+                for page in range(first_page, (stop - 1) // PAGE_SIZE + 1)
+            ]
+            values.append(np.concatenate(pages)[offset : offset + stop - start])
+        return np.column_stack(values).reshape(stop - start, len(features))
+
+    def _get_page(
+        self,
+        feature,
+        key: tuple[int, int],
+        page: int,
+    ) -> np.ndarray:
+        """
+        Get a page of PAGE_SIZE consecutive values of a feature. Each page is generated by a Philox generator whose
+        counter starts at the page index shifted into the second 64-bit word, so pages never overlap. The last page of
+        each feature is kept, as consecutive slices usually share it.
+
+        :param feature: the feature
+        :param key: the indices of the concept and feature
+        :param page: the index of the page
+        :return: the values
+        """
+        cached_page, values = self._pages.get(key, (None, None))
+        if cached_page != page:
+            philox = np.random.Philox(
+                key=self.feature_keys[key[0]][key[1]], counter=page << 64
+            )
+            values = feature.generate(PAGE_SIZE, np.random.Generator(philox))
+            self._pages[key] = (page, values)
+        return values
+
+    def _iter_segments(self):
+        """
+        Generate the concepts and concept drifts as segments of the data stream.
+
+        :return: tuples containing the features of the segment and True if the segment is a concept drift else False
+        """
         i = 0
         while True:
             concept_len = self.rng.integers(
                 self.concept_min_len, self.concept_max_len + 1
             )
-            for x in islice(self.active_concept, concept_len):
-                i += 1
-                yield x, None, False
+            yield self.active_concept.generate(concept_len), False
+            i += concept_len
             new_concept = self._get_new_concept()
             if i >= self.min_len:
                 break
             self.concept_drift.start(self.active_concept, new_concept)
-            for x in self.concept_drift:
-                i += 1
-                yield x, None, True
+            features = self.concept_drift.generate()
+            yield features, True
+            i += len(features)
             self.active_concept = new_concept
 
     def _get_new_concept(self):
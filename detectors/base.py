@@ -2,6 +2,8 @@ import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import numpy as np
+
 
 class SupervisedDriftDetector(ABC):
     """
@@ -17,15 +19,134 @@ class SupervisedDriftDetector(ABC):
         raise NotImplementedError("This abstract base class does not implement update.")
 
 
+class TestScheduler:
+    """
+    The TestScheduler decides at which opportunities an unsupervised concept drift detector performs its test. An
+    opportunity arises whenever the detector's data windows are ready to be tested. Three schedules are supported:
+
+    - "fixed interval": test every test_interval-th opportunity
+    - "exponential backoff": start with test_interval and double the interval after each test without drift up to
+      max_test_interval, a detected drift restores test_interval
+    - "budget": test at most tests_per_second times per second of wall-clock time
+    """
+
+    def __init__(
+        self,
+        test_schedule: str = "fixed interval",
+        test_interval: int = 1,
+        max_test_interval: int = 64,
+        tests_per_second: Optional[float] = None,
+    ):
+        """
+        Init a new TestScheduler.
+
+        :param test_schedule: the schedule, either "fixed interval", "exponential backoff" or "budget"
+        :param test_interval: the (initial) number of opportunities between two tests
+        :param max_test_interval: the maximum number of opportunities between two tests when backing off
+        :param tests_per_second: the maximum number of tests per second when using a budget
+        """
+        if test_schedule not in ("fixed interval", "exponential backoff", "budget"):
+            raise ValueError(f"Unknown test schedule: {test_schedule}")
+        if test_schedule == "budget" and tests_per_second is None:
+            raise ValueError("The budget schedule requires tests_per_second")
+        self.test_schedule = test_schedule
+        self.test_interval = test_interval
+        self.max_test_interval = max_test_interval
+        self.tests_per_second = tests_per_second
+        self.current_interval = test_interval
+        self.n_skips = 0
+        self.tokens = 1.0
+        self.last_time = None
+
+    def should_test(self) -> bool:
+        """
+        Decide if the detector performs its test at the current opportunity.
+
+        :return: True if the detector should test, else False
+        """
+        if self.test_schedule == "budget":
+            now = time.perf_counter()
+            if self.last_time is not None:
+                elapsed = now - self.last_time
+                self.tokens = min(1.0, self.tokens + elapsed * self.tests_per_second)
+            self.last_time = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+        if self.n_skips > 0:
+            self.n_skips -= 1
+            return False
+        return True
+
+    def get_n_skips(self) -> int:
+        """
+        Get the number of upcoming opportunities that are certainly skipped. Detectors use it to process these
+        opportunities in bulk. The budget schedule depends on the wall-clock time, hence no opportunity is certainly
+        skipped.
+
+        :return: the number of opportunities
+        """
+        if self.test_schedule == "budget":
+            return 0
+        return self.n_skips
+
+    def skip(self, n: int):
+        """
+        Skip the given number of opportunities without calling should_test for each of them.
+
+        :param n: the number of opportunities, at most get_n_skips()
+        """
+        self.n_skips -= n
+
+    def record(self, drift: bool):
+        """
+        Record the outcome of a test to determine the number of opportunities skipped until the next test.
+
+        :param drift: True if the test detected a drift, else False
+        """
+        if self.test_schedule == "exponential backoff":
+            if drift:
+                self.current_interval = self.test_interval
+            else:
+                self.current_interval = min(
+                    2 * self.current_interval, self.max_test_interval
+                )
+        self.n_skips = self.current_interval - 1
+
+
 class UnsupervisedDriftDetector(ABC):
     """
     This abstract base class provides a consistent interface for all unsupervised concept drift detectors.
     """
 
-    def __init__(self, seed: Optional[int] = None):
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        test_schedule: str = "fixed interval",
+        test_interval: int = 1,
+        max_test_interval: int = 64,
+        tests_per_second: Optional[float] = None,
+    ):
+        """
+        Init a new UnsupervisedDriftDetector. The test cadence is controlled by a TestScheduler, see there for the
+        available schedules.
+
+        :param seed: the random seed, the current UNIX time if None
+        :param test_schedule: the schedule deciding at which opportunities the detector tests
+        :param test_interval: the (initial) number of opportunities between two tests
+        :param max_test_interval: the maximum number of opportunities between two tests when backing off
+        :param tests_per_second: the maximum number of tests per second when using a budget
+        """
         if seed is None:
             seed = int(time.time())
         self.seed = seed
+        self.scheduler = TestScheduler(
+            test_schedule=test_schedule,
+            test_interval=test_interval,
+            max_test_interval=max_test_interval,
+            tests_per_second=tests_per_second,
+        )
 
     @abstractmethod
     def update(
@@ -33,3 +154,26 @@ class UnsupervisedDriftDetector(ABC):
         features: dict,
     ) -> bool:
         raise NotImplementedError("This abstract base class does not implement update.")
+
+    def update_many(self, features: np.ndarray) -> np.ndarray:
+        """
+        Update the detector with a block of observations and determine at which observations a drift occurred.
+        Inheriting classes may override this method to process the block natively.
+
+        :param features: the features with shape (n_observations, n_features)
+        :returns: a boolean array, True where a drift was detected
+        """
+        return np.fromiter(
+            (self.update(row) for row in features), dtype=bool, count=len(features)
+        )
+
+    def share_history(self, history) -> bool:
+        """
+        Use a data window on the given history shared with other detectors instead of a private copy of the data. Must
+        be called before the first update. Only detectors whose data window always holds the most recent observations
+        can share a history, all others keep their own data.
+
+        :param history: the shared history, see detectors.buffer.SharedHistory
+        :return: True if the detector shares the history, else False
+        """
+        return False
@@ -1,10 +1,11 @@
-from collections import deque
+from typing import Optional
 
 import numpy as np
 from scipy import stats
 from scipy.special import betaln
 
 from .base import UnsupervisedDriftDetector
+from .buffer import RingBuffer
 
 
 class BayesianNonparametricDetectionMethod(UnsupervisedDriftDetector):
@@ -25,7 +26,12 @@ class BayesianNonparametricDetectionMethod(UnsupervisedDriftDetector):
         threshold: float = 0.5,
         max_depth: int = 3,
         reset_mode: str = "full reset",
+        incremental: bool = True,
         seed=None,
+        test_schedule: str = "fixed interval",
+        test_interval: int = 1,
+        max_test_interval: int = 64,
+        tests_per_second: Optional[float] = None,
     ):
         """
         Initialize a new BayesianNonparametricDetectionMethod.
@@ -34,15 +40,36 @@ class BayesianNonparametricDetectionMethod(UnsupervisedDriftDetector):
         :param const: the constant used to determine Polya tree test parameters
         :param threshold: the threshold of the drift detection
         :param max_depth: the max depth of the Polya tree
+        :param incremental: maintain sorted samples and the window sum incrementally instead of normalizing and counting
+            the whole window for each test
+        :param test_schedule: the schedule deciding at which opportunities the detector tests, see TestScheduler
+        :param test_interval: the (initial) number of opportunities between two tests
+        :param max_test_interval: the maximum number of opportunities between two tests when backing off
+        :param tests_per_second: the maximum number of tests per second when using a budget
         """
-        super().__init__(seed)
+        super().__init__(
+            seed,
+            test_schedule=test_schedule,
+            test_interval=test_interval,
+            max_test_interval=max_test_interval,
+            tests_per_second=tests_per_second,
+        )
         self.n_samples = n_samples
-        self.data_window = deque(maxlen=2 * n_samples)
+        self.data_window = RingBuffer(capacity=2 * n_samples)
         self.const = const
         self.threshold = threshold
         self.max_depth = max_depth
         self.reset_mode = reset_mode
         self.distribution = stats.norm(loc=0, scale=1)
+        self.n_bins = 2 ** (max_depth + 1)
+        self.boundaries = self._get_boundaries()
+        self.children, self.alphas = self._get_nodes()
+        self.incremental = incremental
+        self.sorted_one = None
+        self.sorted_two = None
+        self.sorted_window = None
+        self.window_sum = None
+        self.max_incremental_updates = 8
 
     def update(self, features: dict) -> bool:
         """
@@ -55,123 +82,298 @@ class BayesianNonparametricDetectionMethod(UnsupervisedDriftDetector):
             features = np.fromiter(features.values(), dtype=float)
         else:
             features = np.fromiter(features, dtype=float)
+        return self._update(features)
+
+    def update_many(self, features: np.ndarray) -> np.ndarray:
+        """
+        Update the detector with a block of observations and determine at which observations a drift occurred.
+        Observations that do not lead to a test, because the data window is not full or the test is skipped, are
+        appended to the data window in bulk.
+
+        :param features: the features with shape (n_observations, n_features)
+        :returns: a boolean array, True where a drift was detected
+        """
+        features = np.asarray(features, dtype=float)
+        detections = np.zeros(len(features), dtype=bool)
+        i = 0
+        while i < len(features):
+            # observations before the window is full and opportunities certainly skipped do not require a test
+            n_untested = self.data_window.capacity - len(self.data_window) - 1
+            n_skips = self.scheduler.get_n_skips()
+            n = min(max(n_untested, 0) + n_skips, len(features) - i)
+            if n > 0:
+                self._extend(features[i : i + n])
+                self.scheduler.skip(max(n - max(n_untested, 0), 0))
+                i += n
+            else:
+                detections[i] = self._update(features[i])
+                i += 1
+        return detections
+
+    def share_history(self, history) -> bool:
+        """
+        Use a data window on the given history shared with other detectors. The data window always holds the most
+        recent observations, as resets only evict the oldest observations.
+
+        :param history: the shared history, see detectors.buffer.SharedHistory
+        :return: True
+        """
+        self.data_window = history.window(self.data_window.capacity)
+        return True
+
+    def _update(self, features: np.ndarray) -> bool:
+        """
+        Update the detector with the given features and determine if a drift occurred.
+
+        :param features: the features as array
+        :returns: True if a drift was detected else False
+        """
+        if self.incremental:
+            self._update_statistics(features)
         self.data_window.append(features)
-        if len(self.data_window) == self.data_window.maxlen:
-            for i in range(len(features)):
-                sample_one, sample_two = self._get_samples(feature_index=i)
-                log_odd_ratios = self.polya_tree_test(sample_one, sample_two, 0)
-                test_statistic = 1 / (1 + np.exp(-log_odd_ratios))
-                if test_statistic < self.threshold:
+        if len(self.data_window) == self.data_window.capacity:
+            if self.scheduler.should_test():
+                drift = self._detect_drift()
+                self.scheduler.record(drift)
+                if drift:
                     self.reset()
                     return True
         return False
 
-    def polya_tree_test(
-        self,
-        sample_one: np.array,
-        sample_two: np.array,
-        level: int,
-        partition: str = "",
-    ) -> float:
-        """
-        Perform a Polya tree two-sample test with the given samples by partitioning the data to estimate data
-        distribution. As estimations are gathered over multiple levels in a Polya tree two-sample test, this method
-        is called recursively on shrinking partitions until the configured maximum depth is reached.
-
-        :param sample_one: the first sample
-        :param sample_two: the second sample
-        :param level: the current level in the Polya tree
-        :param partition: the binary index of the partition
-        :return: the test statistic that the hypothesis H0, sample_one == sample_two, is rejected
-        """
-        if level > self.max_depth:
-            return 0
-        partition_left = partition + "0"
-        partition_right = partition + "1"
-        n_one_left, n_two_left = self._get_interval_count(
-            sample_one, sample_two, partition_left
-        )
-        n_one_right, n_two_right = self._get_interval_count(
-            sample_one, sample_two, partition_right
-        )
-        n_left = n_one_left + n_two_left
-        n_right = n_one_right + n_two_right
-        if n_one_left + n_one_right == 0 or n_two_left + n_two_right == 0:
-            return 0
+    def _detect_drift(self) -> bool:
+        """
+        Perform the Polya tree test on each feature of the full data window.
 
-        alpha = self.const * (level + 1) ** 2
-        contribution_num = -betaln(alpha, alpha) + betaln(
-            alpha + n_left, alpha + n_right
-        )
-        contribution_den = (
-            -2 * betaln(alpha, alpha)
-            + betaln(alpha + n_one_left, alpha + n_one_right)
-            + betaln(alpha + n_two_left, alpha + n_two_right)
-        )
-        contribution = contribution_num - contribution_den
-        contribution_left = self.polya_tree_test(
-            sample_one, sample_two, level + 1, partition_left
-        )
-        contribution_right = self.polya_tree_test(
-            sample_one, sample_two, level + 1, partition_right
-        )
-        return contribution + contribution_left + contribution_right
+        :return: True if the test statistic of any feature is below the threshold, else False
+        """
+        if self.incremental:
+            counts_one, counts_two = self._get_sorted_bin_counts()
+        else:
+            data = self._normalize(self.data_window.view())
+            counts_one = self._get_bin_counts(data[: self.n_samples])
+            counts_two = self._get_bin_counts(data[self.n_samples :])
+        log_odd_ratios = self._polya_tree_log_odds(counts_one, counts_two)
+        test_statistics = 1 / (1 + np.exp(-log_odd_ratios))
+        return bool(np.any(test_statistics < self.threshold))
 
-    def _get_interval_count(self, sample_one, sample_two, partition) -> (int, int):
+    def _extend(self, features: np.ndarray):
         """
-        Count the number of samples in the provided partition.
+        Append multiple observations to the data window without testing. The sorted samples are rebuilt from the data
+        window unless only few observations are appended.
 
-        :param sample_one: the first sample
-        :param sample_two: the second sample
-        :param partition: the partition
-        :returns: a tuple containing the number of respective items of each sample in the interval
+        :param features: the features with shape (n_observations, n_features)
         """
-        interval = self._get_interval(partition)
-        n_one = np.sum((sample_one > interval[0]) & (sample_one <= interval[1]))
-        n_two = np.sum((sample_two > interval[0]) & (sample_two <= interval[1]))
-        return n_one, n_two
+        if not self.incremental:
+            self.data_window.extend(features)
+        elif len(features) <= self.max_incremental_updates:
+            for row in features:
+                self._update_statistics(row)
+                self.data_window.append(row)
+        else:
+            self.data_window.extend(features)
+            self._rebuild_statistics()
+
+    def _rebuild_statistics(self):
+        """
+        Rebuild the sorted samples and the window sum from the data window.
+        """
+        window = self.data_window.view()
+        self._reset_statistics(n_features=window.shape[1])
+        sample_one = window[: self.n_samples].T
+        sample_two = window[self.n_samples :].T
+        self.sorted_one[:, : sample_one.shape[1]] = np.sort(sample_one, axis=1)
+        self.sorted_two[:, : sample_two.shape[1]] = np.sort(sample_two, axis=1)
+        self.sorted_window[:, : len(window)] = np.sort(window.T, axis=1)
+        self.window_sum = window.sum(axis=0)
 
-    def _get_interval(self, partition) -> (float, float):
+    def _update_statistics(self, features: np.ndarray):
         """
-        Get the interval of the current partition.
+        Update the sorted samples and the window sum with the given features before they are appended to the data
+        window. Once the window is full, the oldest item of the first sample is evicted and the oldest item of the
+        second sample moves to the first sample.
 
-        :param partition: the partition
-        :returns: a tuple containing start and end of the interval
+        :param features: the features
         """
-        partition_index = int(partition, 2)
-        level = len(partition)
-        quantile_start = partition_index / 2**level
-        quantile_end = (partition_index + 1) / 2**level
-        interval = self.distribution.ppf([quantile_start, quantile_end])
-        return interval
+        if self.sorted_window is None:
+            self._reset_statistics(n_features=len(features))
+        size = len(self.data_window)
+        if size == self.data_window.capacity:
+            evicted = self.data_window[0]
+            moved = self.data_window[self.n_samples]
+            _replace_sorted(self.sorted_one, evicted, moved)
+            _replace_sorted(self.sorted_two, moved, features)
+            _replace_sorted(self.sorted_window, evicted, features)
+            # the sum is refreshed periodically to prevent accumulating floating point errors
+            self.n_slides += 1
+            if self.n_slides % self.data_window.capacity == 0:
+                self.window_sum = self.sorted_window.sum(axis=1)
+            else:
+                self.window_sum += features - evicted
+            return
+        padding = np.full(len(features), np.inf)
+        if size < self.n_samples:
+            _replace_sorted(self.sorted_one, padding, features)
+        else:
+            _replace_sorted(self.sorted_two, padding, features)
+        _replace_sorted(self.sorted_window, padding, features)
+        self.window_sum += features
 
-    def _get_samples(self, feature_index):
+    def _reset_statistics(self, n_features: int):
         """
-        Get the normalized samples of the given index.
+        Reset the sorted samples and the window sum. Unused positions of the sorted samples are padded with infinity.
 
-        :param feature_index: the index of the feature
-        :return: a tuple containing two normalized samples
+        :param n_features: the number of features
         """
-        data = np.array(self.data_window)
-        data_slice = data[:, feature_index]
-        normalized_data_slice = self._normalize(data_slice)
-        sample_one = normalized_data_slice[: self.n_samples]
-        sample_two = normalized_data_slice[self.n_samples :]
-        return sample_one, sample_two
+        self.sorted_one = np.full((n_features, self.n_samples), np.inf)
+        self.sorted_two = np.full((n_features, self.n_samples), np.inf)
+        self.sorted_window = np.full((n_features, 2 * self.n_samples), np.inf)
+        self.window_sum = np.zeros(n_features)
+        self.n_slides = 0
+
+    def _get_sorted_bin_counts(self) -> (np.ndarray, np.ndarray):
+        """
+        Count the items of both samples in the partitions at the finest level of the Polya tree using the sorted
+        samples. Instead of normalizing the data, the partition boundaries are transformed to the original scale.
+
+        :returns: a tuple containing the counts of each sample with shape (n_features, n_bins)
+        """
+        mean = self.window_sum / self.data_window.capacity
+        iqr = self._sorted_iqr(self.sorted_window)
+        scale = np.where(iqr != 0, iqr, 1)
+        boundaries = mean[:, None] + scale[:, None] * self.boundaries
+        counts_one = self._count_sorted(self.sorted_one, boundaries)
+        counts_two = self._count_sorted(self.sorted_two, boundaries)
+        return counts_one, counts_two
+
+    @staticmethod
+    def _sorted_iqr(sorted_rows: np.ndarray) -> np.ndarray:
+        """
+        Get the interquartile range of each sorted row using linear interpolation like scipy.stats.iqr.
+
+        :param sorted_rows: the sorted rows
+        :return: the interquartile ranges
+        """
+        n = sorted_rows.shape[1]
+        quartiles = []
+        for quantile in (0.25, 0.75):
+            index = quantile * (n - 1)
+            lower = int(np.floor(index))
+            upper = min(lower + 1, n - 1)
+            fraction = index - lower
+            lower_values = sorted_rows[:, lower]
+            upper_values = sorted_rows[:, upper]
+            quartiles.append(lower_values + (upper_values - lower_values) * fraction)
+        return quartiles[1] - quartiles[0]
+
+    @staticmethod
+    def _count_sorted(sorted_rows: np.ndarray, boundaries: np.ndarray) -> np.ndarray:
+        """
+        Count the items of each sorted row in the left-open and right-closed intervals given by the boundaries.
+
+        :param sorted_rows: the sorted rows with shape (n_features, n_items)
+        :param boundaries: the inner boundaries of each row with shape (n_features, n_bins - 1)
+        :return: the counts with shape (n_features, n_bins)
+        """
+        n_rows, n_items = sorted_rows.shape
+        cumulative_counts = np.empty((n_rows, boundaries.shape[1] + 2), dtype=int)
+        cumulative_counts[:, 0] = 0
+        cumulative_counts[:, -1] = n_items
+        for i in range(n_rows):
+            cumulative_counts[i, 1:-1] = np.searchsorted(
+                sorted_rows[i], boundaries[i], side="right"
+            )
+        return cumulative_counts[:, 1:] - cumulative_counts[:, :-1]
+
+    def _get_boundaries(self) -> np.ndarray:
+        """
+        Get the inner boundaries of the partitions at the finest level of the Polya tree. Coarser partitions are unions
+        of neighbouring partitions at the finest level, so their boundaries are a subset of these.
+
+        :return: the inner boundaries in ascending order
+        """
+        quantiles = np.arange(1, self.n_bins) / self.n_bins
+        return self.distribution.ppf(quantiles)
+
+    def _get_nodes(self) -> (np.ndarray, np.ndarray):
+        """
+        Get the nodes of the Polya tree in breadth-first order. Each node is described by the partitions at the finest
+        level belonging to its left and right child, and by the parameter alpha of its level.
+
+        :returns: a tuple containing the matrix mapping finest level counts to children counts with shape
+            (n_bins, 2 * n_nodes) and the alpha of each node
+        """
+        children = []
+        alphas = []
+        for level in range(self.max_depth + 1):
+            width = self.n_bins // 2 ** (level + 1)
+            for child in range(2 ** (level + 1)):
+                partitions = np.zeros(self.n_bins)
+                partitions[child * width : (child + 1) * width] = 1
+                children.append(partitions)
+            alphas += [self.const * (level + 1) ** 2] * 2**level
+        return np.array(children).T, np.array(alphas)
+
+    def _get_bin_counts(self, sample: np.ndarray) -> np.ndarray:
+        """
+        Count the items of each feature of the given normalized sample in the partitions at the finest level of the
+        Polya tree. Partitions are left-open and right-closed intervals.
+
+        :param sample: the normalized sample with shape (n_items, n_features)
+        :return: the counts with shape (n_features, n_bins)
+        """
+        n_features = sample.shape[1]
+        bins = np.searchsorted(self.boundaries, sample, side="left")
+        bins += np.arange(n_features) * self.n_bins
+        counts = np.bincount(bins.ravel(), minlength=n_features * self.n_bins)
+        return counts.reshape(n_features, self.n_bins)
+
+    def _polya_tree_log_odds(
+        self, counts_one: np.ndarray, counts_two: np.ndarray
+    ) -> np.ndarray:
+        """
+        Perform the Polya tree two-sample test of all features at once. Instead of recursing over the partitions
+        of each level until the maximum depth is reached, all nodes of the tree are evaluated as arrays. The counts of
+        the children of each node are obtained by summing neighbouring partitions of the finest level. A node
+        contributes the log ratio of the Beta functions of the pooled and the separate counts of its children, with
+        alpha = const * (level + 1)^2.
+
+        :param counts_one: the counts of the first sample at the finest level with shape (n_features, n_bins)
+        :param counts_two: the counts of the second sample at the finest level with shape (n_features, n_bins)
+        :return: the log odds that the hypothesis H0, sample_one == sample_two, is rejected for each feature
+        """
+        children_one = counts_one @ self.children
+        children_two = counts_two @ self.children
+        n_one_left, n_one_right = children_one[:, 0::2], children_one[:, 1::2]
+        n_two_left, n_two_right = children_two[:, 0::2], children_two[:, 1::2]
+        n_left = n_one_left + n_two_left
+        n_right = n_one_right + n_two_right
+
+        alpha = self.alphas
+        contribution_num = -betaln(alpha, alpha) + betaln(
+            alpha + n_left, alpha + n_right
+        )
+        contribution_den = (
+            -2 * betaln(alpha, alpha)
+            + betaln(alpha + n_one_left, alpha + n_one_right)
+            + betaln(alpha + n_two_left, alpha + n_two_right)
+        )
+        contribution = contribution_num - contribution_den
+        # nodes not containing items of both samples do not contribute, neither do their descendants
+        empty = (n_one_left + n_one_right == 0) | (n_two_left + n_two_right == 0)
+        return np.where(empty, 0, contribution).sum(axis=1)
 
     @staticmethod
     def _normalize(data):
         """
         Normalize the given data by subtracting the mean and dividing by the interquartile range. If the interquartile
-        range is 0, no division occurs.
+        range is 0, no division occurs. Two-dimensional data is normalized column by column.
 
         :param data: the data
         :return: the normalized data
         """
         normalized = data - np.mean(data, axis=0)
         iqr = stats.iqr(data, axis=0)
-        if iqr != 0:
-            normalized = normalized / iqr
+        normalized = normalized / np.where(iqr != 0, iqr, 1)
         return normalized
 
     def reset(self):
@@ -179,10 +381,39 @@ class BayesianNonparametricDetectionMethod(UnsupervisedDriftDetector):
         Reset the drift detector by deleting the reference data and recent data.
         """
         if self.reset_mode == "full reset":
-            self.data_window = deque(maxlen=2 * self.n_samples)
+            self.data_window.clear()
+            if self.sorted_window is not None:
+                self._reset_statistics(n_features=len(self.window_sum))
         elif self.reset_mode == "half reset":
-            data = list(self.data_window)
-            self.data_window = deque(maxlen=2 * self.n_samples)
-            self.data_window += data[self.n_samples :]
+            self.data_window.popleft(self.n_samples)
+            if self.sorted_window is not None:
+                sorted_two = self.sorted_two
+                self._reset_statistics(n_features=len(self.window_sum))
+                self.sorted_one = sorted_two
+                self.sorted_window[:, : self.n_samples] = sorted_two
+                self.window_sum = sorted_two.sum(axis=1)
         elif self.reset_mode == "no reset":
             pass
+
+
+def _replace_sorted(
+    sorted_rows: np.ndarray, old_values: np.ndarray, new_values: np.ndarray
+):
+    """
+    Replace an occurrence of the old value by the new value in each sorted row. The rows stay sorted, as only the items
+    between the position of the old value and the insertion position of the new value are shifted. The rows are
+    modified in place.
+
+    :param sorted_rows: the sorted rows with shape (n_rows, n_items)
+    :param old_values: the values to remove from each row, must be contained in the respective row
+    :param new_values: the values to insert into each row
+    """
+    for row, old_value, new_value in zip(sorted_rows, old_values, new_values):
+        removed = np.searchsorted(row, old_value)
+        inserted = np.searchsorted(row, new_value)
+        if inserted > removed:
+            row[removed : inserted - 1] = row[removed + 1 : inserted]
+            row[inserted - 1] = new_value
+        else:
+            row[inserted + 1 : removed + 1] = row[inserted:removed]
+            row[inserted] = new_value
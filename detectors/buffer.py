@@ -0,0 +1,238 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    A first-in-first-out buffer of feature vectors with a fixed capacity. The buffer is backed by a preallocated array
+    in which every row is written twice, at its position and at its position plus the capacity. Hence, the buffered
+    rows are always available as a single contiguous view without copying.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Init a new RingBuffer instance. The storage is allocated on the first append, once the number of features is
+        known.
+
+        :param capacity: the maximum number of rows
+        """
+        self.capacity = capacity
+        self.storage = None
+        self.head = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def _allocate(self, n_features: int):
+        """
+        Allocate the storage for rows with the given number of features.
+
+        :param n_features: the number of features
+        """
+        self.storage = np.empty((2 * self.capacity, n_features))
+
+    def append(self, row: np.ndarray):
+        """
+        Append a row. If the buffer is full, the oldest row is evicted.
+
+        :param row: the row
+        """
+        if self.storage is None:
+            self._allocate(len(row))
+        if self.size == self.capacity:
+            self.popleft()
+        position = (self.head + self.size) % self.capacity
+        self.storage[position] = row
+        self.storage[position + self.capacity] = row
+        self.size += 1
+
+    def extend(self, rows: np.ndarray):
+        """
+        Append multiple rows at once. If the buffer overflows, the oldest rows are evicted.
+
+        :param rows: the rows with shape (n_rows, n_features)
+        """
+        if len(rows) == 0:
+            return
+        if self.storage is None:
+            self._allocate(rows.shape[1])
+        rows = rows[-self.capacity :]
+        overflow = self.size + len(rows) - self.capacity
+        if overflow > 0:
+            self.popleft(overflow)
+        positions = (self.head + self.size + np.arange(len(rows))) % self.capacity
+        self.storage[positions] = rows
+        self.storage[positions + self.capacity] = rows
+        self.size += len(rows)
+
+    def popleft(self, n: int = 1):
+        """
+        Evict the oldest rows by moving the head of the buffer. No data is copied.
+
+        :param n: the number of rows
+        """
+        n = min(n, self.size)
+        self.head = (self.head + n) % self.capacity
+        self.size -= n
+
+    def clear(self):
+        """
+        Evict all rows.
+        """
+        self.head = 0
+        self.size = 0
+
+    def view(self) -> np.ndarray:
+        """
+        Get the buffered rows from the oldest to the most recent row.
+
+        :return: a contiguous view with shape (size, n_features)
+        """
+        if self.storage is None:
+            return np.empty((0, 0))
+        return self.storage[self.head : self.head + self.size]
+
+
+class SharedHistory:
+    """
+    The most recent rows of a data stream, shared by the data windows of multiple detectors processing the same
+    stream. Like RingBuffer, every row is written twice, so any range of recent rows is a contiguous view. The history
+    is extended with a block of rows before the detectors process the block.
+    """
+
+    def __init__(self):
+        """
+        Init a new SharedHistory instance. The storage is allocated on the first extend, once the capacities of the
+        windows and the block size are known.
+        """
+        self.window_capacity = 0
+        self.capacity = 0
+        self.storage = None
+        self.n_rows = 0
+
+    def window(self, capacity: int) -> "HistoryWindow":
+        """
+        Create a data window on the history. Windows must be created before the history is extended.
+
+        :param capacity: the maximum number of rows of the window
+        :return: the window
+        """
+        if self.n_rows > 0:
+            raise RuntimeError("Windows must be created before the history is extended")
+        self.window_capacity = max(self.window_capacity, capacity)
+        return HistoryWindow(self, capacity)
+
+    def extend(self, rows: np.ndarray):
+        """
+        Append a block of rows. The history keeps at least the rows of the largest window in addition to the block.
+
+        :param rows: the rows with shape (n_rows, n_features)
+        """
+        required_capacity = self.window_capacity + len(rows)
+        if self.storage is None:
+            self.capacity = required_capacity
+            self.storage = np.empty((2 * self.capacity, rows.shape[1]))
+        elif required_capacity > self.capacity:
+            # keep the rows of the largest window when growing for a larger block
+            kept = self.get(max(self.n_rows - self.window_capacity, 0), self.n_rows)
+            kept = kept.copy()
+            self.capacity = required_capacity
+            self.storage = np.empty((2 * self.capacity, rows.shape[1]))
+            self._write(self.n_rows - len(kept), kept)
+        self._write(self.n_rows, rows)
+        self.n_rows += len(rows)
+
+    def get(self, start: int, stop: int) -> np.ndarray:
+        """
+        Get the rows with indices in [start, stop) as read-only view.
+
+        :param start: the index of the first row
+        :param stop: the index after the last row
+        :return: the rows
+        """
+        if self.storage is None:
+            return np.empty((0, 0))
+        if start < self.n_rows - self.capacity or stop > self.n_rows:
+            raise IndexError(f"The rows [{start}, {stop}) are not in the history")
+        position = start % self.capacity
+        view = self.storage[position : position + stop - start]
+        view.flags.writeable = False
+        return view
+
+    def _write(self, start: int, rows: np.ndarray):
+        """
+        Write rows starting at the given index.
+
+        :param start: the index of the first row
+        :param rows: the rows
+        """
+        positions = (start + np.arange(len(rows))) % self.capacity
+        self.storage[positions] = rows
+        self.storage[positions + self.capacity] = rows
+
+
+class HistoryWindow:
+    """
+    A data window on a SharedHistory with the interface of RingBuffer. The window is a range of the most recent rows,
+    hence appending rows only moves the end of the window. The rows appended must be the next rows of the history.
+    """
+
+    def __init__(self, history: SharedHistory, capacity: int):
+        """
+        Init a new HistoryWindow instance.
+
+        :param history: the shared history
+        :param capacity: the maximum number of rows
+        """
+        self.history = history
+        self.capacity = capacity
+        self.stop = history.n_rows
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def append(self, row: np.ndarray):
+        """
+        Append the next row of the history. If the window is full, the oldest row is evicted.
+
+        :param row: the row, which is already contained in the history
+        """
+        self.extend(row[None])
+
+    def extend(self, rows: np.ndarray):
+        """
+        Append the next rows of the history. If the window overflows, the oldest rows are evicted.
+
+        :param rows: the rows, which are already contained in the history
+        """
+        self.stop += len(rows)
+        self.size = min(self.size + len(rows), self.capacity)
+
+    def popleft(self, n: int = 1):
+        """
+        Evict the oldest rows.
+
+        :param n: the number of rows
+        """
+        self.size -= min(n, self.size)
+
+    def clear(self):
+        """
+        Evict all rows.
+        """
+        self.size = 0
+
+    def view(self) -> np.ndarray:
+        """
+        Get the rows from the oldest to the most recent row.
+
+        :return: a read-only view with shape (size, n_features)
+        """
+        return self.history.get(self.stop - self.size, self.stop)
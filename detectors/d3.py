@@ -1,11 +1,13 @@
-from typing import Optional
+from typing import Iterable, Optional
 
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+from scipy.stats import rankdata
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import StratifiedKFold
 
 from .base import UnsupervisedDriftDetector
+from .buffer import RingBuffer
+from .discriminators import Discriminator, get_discriminator
 
 
 class DiscriminativeDriftDetector2019(UnsupervisedDriftDetector):
@@ -26,7 +28,13 @@ class DiscriminativeDriftDetector2019(UnsupervisedDriftDetector):
         threshold: float = 0.7,
         reset: str = "reset full",
         step: str = "step half",
+        discriminator: str = "logistic regression",
+        test_kernel: str = "fast",
         seed: Optional[int] = None,
+        test_schedule: str = "fixed interval",
+        test_interval: int = 1,
+        max_test_interval: int = 64,
+        tests_per_second: Optional[float] = None,
     ):
         """
         Init new D3 instance.
@@ -35,16 +43,37 @@ class DiscriminativeDriftDetector2019(UnsupervisedDriftDetector):
         :param recent_samples_proportion: the proportion of data used to represent the new concept relative to the
             number of data used to represent current concept
         :param threshold: the threshold above which two concepts can be reliably discerned and a drift is signalled
+        :param discriminator: the discriminator, either "logistic regression" (scikit-learn, as in the paper),
+            "newton logistic regression" or "lda", see detectors.discriminators
+        :param test_kernel: "fast" to use precomputed folds and a rank-based AUC, "sklearn" to split and score with
+            scikit-learn on every test, or "verify" to use the fast kernel and check it against scikit-learn
+        :param test_schedule: the schedule deciding at which opportunities the detector tests, see TestScheduler
+        :param test_interval: the (initial) number of opportunities between two tests
+        :param max_test_interval: the maximum number of opportunities between two tests when backing off
+        :param tests_per_second: the maximum number of tests per second when using a budget
         """
-        super().__init__(seed)
-        self.data = []
+        super().__init__(
+            seed,
+            test_schedule=test_schedule,
+            test_interval=test_interval,
+            max_test_interval=max_test_interval,
+            tests_per_second=tests_per_second,
+        )
         self.n_reference_samples = n_reference_samples
         self.recent_samples_proportion = recent_samples_proportion
         self.n_samples = int(n_reference_samples * (1 + recent_samples_proportion))
+        self.data = RingBuffer(capacity=self.n_samples)
         self.threshold = threshold
         self.reset = reset
         self.step = step
+        self.discriminator = get_discriminator(discriminator, seed=self.seed)
+        if test_kernel not in ("fast", "sklearn", "verify"):
+            raise ValueError(f"Unknown test kernel: {test_kernel}")
+        self.test_kernel = test_kernel
         self.kfold = StratifiedKFold(n_splits=2, shuffle=True, random_state=self.seed)
+        self.labels = self._get_labels()
+        # the split only depends on the labels and the seed, hence it is identical for every test
+        self.folds = list(self.kfold.split(np.zeros(self.n_samples), self.labels))
 
     def update(self, features: dict) -> bool:
         """
@@ -57,41 +86,131 @@ class DiscriminativeDriftDetector2019(UnsupervisedDriftDetector):
             features = np.fromiter(features.values(), dtype=float)
         else:
             features = np.fromiter(features, dtype=float)
+        return self._update(features)
+
+    def update_many(self, features: np.ndarray) -> np.ndarray:
+        """
+        Update the detector with a block of observations and determine at which observations a drift occurred. The
+        data windows are filled in bulk and skipped tests only slide the windows.
+
+        :param features: the features with shape (n_observations, n_features)
+        :returns: a boolean array, True where a drift was detected
+        """
+        features = np.asarray(features, dtype=float)
+        detections = np.zeros(len(features), dtype=bool)
+        i = 0
+        while i < len(features):
+            n_missing = self.n_samples - len(self.data)
+            if n_missing > 0:
+                n = min(n_missing, len(features) - i)
+                self.data.extend(features[i : i + n])
+                i += n
+            elif self.scheduler.get_n_skips() > 0:
+                self.scheduler.skip(1)
+                self.data.popleft(self._get_step())
+                i += 1
+            else:
+                detections[i] = self._update(features[i])
+                i += 1
+        return detections
+
+    def _update(self, features: np.ndarray) -> bool:
+        """
+        Update the detector with the given features and detect if a drift occurred.
+
+        :param features: the features as array
+        :returns: True if a drift occurred else False
+        """
         if len(self.data) != self.n_samples:
             self.data.append(features)
         else:
-            if self._detect_drift():
+            drift = False
+            # skipped tests slide the windows as if no drift was detected
+            if self.scheduler.should_test():
+                drift = self._detect_drift()
+                self.scheduler.record(drift)
+            if drift:
                 if self.reset == "reset half":
-                    self.data = self.data[self.n_reference_samples :]
+                    self.data.popleft(self.n_reference_samples)
                 elif self.reset == "reset full":
-                    self.data = []
+                    self.data.clear()
                 else:
-                    self.data = self.data[1:]
+                    self.data.popleft()
                 return True
             else:
-                if self.step == "step half":
-                    step = int(
-                        np.ceil(
-                            self.n_reference_samples * self.recent_samples_proportion
-                        )
-                    )
-                else:
-                    step = 1
-                self.data = self.data[step:]
+                self.data.popleft(self._get_step())
         return False
 
+    def _get_step(self) -> int:
+        """
+        Get the number of samples the data windows slide if no drift was detected.
+
+        :return: the step
+        """
+        if self.step == "step half":
+            return int(
+                np.ceil(self.n_reference_samples * self.recent_samples_proportion)
+            )
+        return 1
+
     def _detect_drift(self) -> bool:
         """
         Detect if a drift occurred.
 
         :return: True if a drift occurred, else False
         """
-        labels = self._get_labels()
-        discriminator = LogisticRegression(solver="liblinear", random_state=self.seed)
-        predictions = self._predict(discriminator, np.array(self.data), labels)
-        auc_score = roc_auc_score(labels, predictions)
+        data = self.data.view()
+        if self.test_kernel == "sklearn":
+            folds = self.kfold.split(data, self.labels)
+            predictions = self._predict(self.discriminator, data, self.labels, folds)
+            auc_score = roc_auc_score(self.labels, predictions)
+        else:
+            predictions = self._predict(
+                self.discriminator, data, self.labels, self.folds
+            )
+            auc_score = self._get_auc_score(predictions)
+            if self.test_kernel == "verify":
+                self._verify(data, predictions, auc_score)
         return auc_score >= self.threshold
 
+    def _get_auc_score(self, predictions: np.array) -> float:
+        """
+        Get the area under the ROC curve of the predictions by computing the Mann-Whitney U statistic of the recent data
+        window against the reference data window. Ties are ranked by their average rank.
+
+        :param predictions: the predictions
+        :return: the AUC score
+        """
+        n_recent_samples = self.n_samples - self.n_reference_samples
+        ranks = rankdata(predictions)
+        rank_sum = ranks[self.n_reference_samples :].sum()
+        u_statistic = rank_sum - n_recent_samples * (n_recent_samples + 1) / 2
+        return u_statistic / (self.n_reference_samples * n_recent_samples)
+
+    def _verify(self, data: np.array, predictions: np.array, auc_score: float):
+        """
+        Verify the fast test kernel against the scikit-learn path.
+
+        :param data: the data of the current test
+        :param predictions: the predictions of the fast test kernel
+        :param auc_score: the AUC score of the fast test kernel
+        """
+        for (train_index, test_index), (
+            expected_train_index,
+            expected_test_index,
+        ) in zip(self.folds, self.kfold.split(data, self.labels)):
+            if not np.array_equal(
+                train_index, expected_train_index
+            ) or not np.array_equal(test_index, expected_test_index):
+                raise RuntimeError(
+                    "The precomputed folds differ from scikit-learn's folds"
+                )
+        expected_auc_score = roc_auc_score(self.labels, predictions)
+        if not np.isclose(auc_score, expected_auc_score, rtol=0, atol=1e-12):
+            raise RuntimeError(
+                f"The AUC score {auc_score} differs from scikit-learn's AUC score {expected_auc_score}"
+            )
+
     def _get_labels(self) -> np.array:
         """
         Get labels for the reference data window and the recent data window.
@@ -102,20 +221,25 @@ class DiscriminativeDriftDetector2019(UnsupervisedDriftDetector):
         labels[self.n_reference_samples :] = 1
         return labels
 
-    def _predict(self, discriminator, data: np.array, labels: np.array) -> np.array:
+    def _predict(
+        self,
+        discriminator: Discriminator,
+        data: np.array,
+        labels: np.array,
+        folds: Iterable,
+    ) -> np.array:
         """
         Train and test the discriminator on the given data in a kfold validation scheme.
 
         :param discriminator: the discriminator
         :param data: the data the discriminator is trained on
         :param labels: the labels of the data
+        :param folds: the train and test indices of each fold
         :return: the predictions
         """
         predictions = np.zeros(self.n_samples)
         # kfold testing is not described in the paper, but used in the source code provided by the authors
-        for train_index, test_index in self.kfold.split(data, labels):
+        for train_index, test_index in folds:
             discriminator.fit(data[train_index], labels[train_index])
-            predictions[test_index] = discriminator.predict_proba(data[test_index])[
-                :, 1
-            ]
+            predictions[test_index] = discriminator.predict_proba(data[test_index])
         return predictions
@@ -0,0 +1,190 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+from scipy.special import expit
+from sklearn.linear_model import LogisticRegression
+
+
+class Discriminator(ABC):
+    """
+    This abstract base class provides a consistent interface for the binary classifiers used by D3 to discern the
+    reference data window from the recent data window.
+    """
+
+    @abstractmethod
+    def fit(self, data: np.ndarray, labels: np.ndarray):
+        raise NotImplementedError("This abstract base class does not implement fit.")
+
+    @abstractmethod
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        raise NotImplementedError(
+            "This abstract base class does not implement predict_proba."
+        )
+
+
+class SklearnLogisticRegression(Discriminator):
+    """
+    The logistic regression of scikit-learn with the liblinear solver as used in the original D3 experiments.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Init a new SklearnLogisticRegression.
+
+        :param seed: the random seed
+        """
+        self.model = LogisticRegression(solver="liblinear", random_state=seed)
+
+    def fit(self, data: np.ndarray, labels: np.ndarray):
+        """
+        Fit the discriminator.
+
+        :param data: the data
+        :param labels: the binary labels
+        """
+        self.model.fit(data, labels)
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict the probability of label 1.
+
+        :param data: the data
+        :return: the probabilities
+        """
+        return self.model.predict_proba(data)[:, 1]
+
+
+class NewtonLogisticRegression(Discriminator):
+    """
+    A logistic regression with L2 regularization of the coefficients, fitted by Newton's method in NumPy. It avoids the
+    validation overhead of scikit-learn, which dominates for few features. Consecutive D3 tests overlap heavily, so each
+    fit starts from the previous coefficients and usually converges within few steps.
+    """
+
+    def __init__(
+        self,
+        c: float = 1.0,
+        max_iter: int = 20,
+        tol: float = 1e-6,
+        warm_start: bool = True,
+    ):
+        """
+        Init a new NewtonLogisticRegression.
+
+        :param c: the inverse of the regularization strength
+        :param max_iter: the maximum number of Newton steps
+        :param tol: the tolerance of the largest update of the coefficients
+        :param warm_start: start each fit from the previous coefficients
+        """
+        self.c = c
+        self.max_iter = max_iter
+        self.tol = tol
+        self.warm_start = warm_start
+        self.coefficients = None
+
+    def fit(self, data: np.ndarray, labels: np.ndarray):
+        """
+        Fit the discriminator. The intercept is the last coefficient and is not regularized.
+
+        :param data: the data
+        :param labels: the binary labels
+        """
+        n_items, n_features = data.shape
+        design = np.empty((n_items, n_features + 1))
+        design[:, :-1] = data
+        design[:, -1] = 1
+        regularization = np.full(n_features + 1, 1 / self.c)
+        regularization[-1] = 0
+        if (
+            not self.warm_start
+            or self.coefficients is None
+            or len(self.coefficients) != n_features + 1
+        ):
+            self.coefficients = np.zeros(n_features + 1)
+        for _ in range(self.max_iter):
+            probabilities = expit(design @ self.coefficients)
+            gradient = (
+                design.T @ (probabilities - labels) + regularization * self.coefficients
+            )
+            weights = probabilities * (1 - probabilities)
+            hessian = (design.T * weights) @ design + np.diag(regularization)
+            # a small ridge keeps the hessian invertible for degenerate data
+            hessian[np.diag_indices_from(hessian)] += 1e-10
+            update = np.linalg.solve(hessian, gradient)
+            self.coefficients -= update
+            if np.max(np.abs(update)) < self.tol:
+                break
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict the probability of label 1.
+
+        :param data: the data
+        :return: the probabilities
+        """
+        return expit(data @ self.coefficients[:-1] + self.coefficients[-1])
+
+
+class LinearDiscriminantAnalysis(Discriminator):
+    """
+    A linear discriminant analysis with a pooled covariance matrix, fitted in closed form in NumPy. The covariance
+    matrix is shrunk slightly towards its diagonal to remain invertible.
+    """
+
+    def __init__(self, shrinkage: float = 1e-3):
+        """
+        Init a new LinearDiscriminantAnalysis.
+
+        :param shrinkage: the proportion of the mean variance added to the diagonal of the covariance matrix
+        """
+        self.shrinkage = shrinkage
+        self.weights = None
+        self.intercept = None
+
+    def fit(self, data: np.ndarray, labels: np.ndarray):
+        """
+        Fit the discriminator.
+
+        :param data: the data
+        :param labels: the binary labels
+        """
+        is_one = labels == 1
+        data_zero = data[~is_one]
+        data_one = data[is_one]
+        mean_zero = data_zero.mean(axis=0)
+        mean_one = data_one.mean(axis=0)
+        centered = np.concatenate([data_zero - mean_zero, data_one - mean_one])
+        covariance = centered.T @ centered / max(len(data) - 2, 1)
+        ridge = self.shrinkage * np.trace(covariance) / len(covariance)
+        covariance[np.diag_indices_from(covariance)] += max(ridge, 1e-12)
+        self.weights = np.linalg.solve(covariance, mean_one - mean_zero)
+        self.intercept = -0.5 * (mean_zero + mean_one) @ self.weights + np.log(
+            len(data_one) / len(data_zero)
+        )
+
+    def predict_proba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Predict the probability of label 1.
+
+        :param data: the data
+        :return: the probabilities
+        """
+        return expit(data @ self.weights + self.intercept)
+
+
+def get_discriminator(name: str, seed: Optional[int] = None) -> Discriminator:
+    """
+    Get the discriminator with the given name.
+
+    :param name: the name, either "logistic regression" (scikit-learn), "newton logistic regression" or "lda"
+    :param seed: the random seed
+    :return: the discriminator
+    """
+    if name == "logistic regression":
+        return SklearnLogisticRegression(seed=seed)
+    elif name == "newton logistic regression":
+        return NewtonLogisticRegression()
+    elif name == "lda":
+        return LinearDiscriminantAnalysis()
+    raise ValueError(f"Unknown discriminator: {name}")
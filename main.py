@@ -1,4 +1,8 @@
 from config import (
+    CACHE_DIR,
+    FAN_OUT,
+    RESULTS_DIR,
+    WORKERS,
     AbruptConfiguration,
     InsectsConfiguration,
     D3Configuration,
@@ -9,11 +13,47 @@ from runner import run
 
 
 def main():
-    run("BNDM vs D3", BNDMvsD3Configuration)
-    run("D3", D3Configuration)
-    run("Abrupt", AbruptConfiguration)
-    run("Incremental", IncrementalConfiguration)
-    run("Insects", InsectsConfiguration)
+    run(
+        "BNDM vs D3",
+        BNDMvsD3Configuration,
+        cache_dir=CACHE_DIR,
+        workers=WORKERS,
+        results_dir=RESULTS_DIR,
+        fan_out=FAN_OUT,
+    )
+    run(
+        "D3",
+        D3Configuration,
+        cache_dir=CACHE_DIR,
+        workers=WORKERS,
+        results_dir=RESULTS_DIR,
+        fan_out=FAN_OUT,
+    )
+    run(
+        "Abrupt",
+        AbruptConfiguration,
+        cache_dir=CACHE_DIR,
+        workers=WORKERS,
+        results_dir=RESULTS_DIR,
+        fan_out=FAN_OUT,
+    )
+    run(
+        "Incremental",
+        IncrementalConfiguration,
+        cache_dir=CACHE_DIR,
+        workers=WORKERS,
+        results_dir=RESULTS_DIR,
+        fan_out=FAN_OUT,
+    )
+    run(
+        "Insects",
+        InsectsConfiguration,
+        cache_dir=CACHE_DIR,
+        workers=WORKERS,
+        results_dir=RESULTS_DIR,
+        fan_out=FAN_OUT,
+        metrics=("f1", "recall", "precision", "time_to_detection"),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""This module provides the streaming aggregation of response curves across runs."""
+
+from typing import Optional
+
+import numpy as np
+
+from metrics.response_curve import (
+    RATIO_METRICS,
+    ResponseCurve,
+    ResponseTable,
+    to_response_curve,
+)
+
+
+class ResponseAggregator:
+    """
+    ResponseAggregator summarizes the response curves of multiple runs while they finish. For each metric, it keeps the
+    number of defined scores and their running mean and sum of squared deviations (Welford's algorithm) at the union of
+    the breakpoints of the curves, instead of every curve. As in ResponseCurve.mean, undefined scores and curves which
+    ended before a Delta_max are ignored. Optionally, histograms of the ratio metrics serve as quantile sketches.
+    """
+
+    def __init__(
+        self,
+        metrics: Optional[list[str]] = None,
+        n_bins: Optional[int] = None,
+        keep_curves: bool = False,
+    ):
+        """
+        Init a new ResponseAggregator.
+
+        :param metrics: the aggregated metrics, by default all metrics of the first added scores
+        :param n_bins: the number of histogram bins between 0 and 1 of the quantile sketches of the ratio metrics, or
+            None for no sketches
+        :param keep_curves: keep the added scores in curves in addition to the summary
+        """
+        self.metrics = metrics
+        self.n_bins = n_bins
+        self.curves = [] if keep_curves else None
+        self.n_runs = 0
+        self.deltas = None
+        self.stop = 0
+        self.counts = {}
+        self.means = {}
+        self.squared_deviations = {}
+        self.histograms = {}
+
+    def add(self, scores):
+        """
+        Fold the scores of a run into the summary.
+
+        :param scores: a response table, a response curve or a dense list of F1 scores
+        """
+        if self.metrics is None:
+            if isinstance(scores, ResponseTable):
+                self.metrics = list(scores.columns)
+            else:
+                self.metrics = ["f1"]
+        curves = {metric: to_response_curve(scores, metric) for metric in self.metrics}
+        first = curves[self.metrics[0]]
+        self._expand(first.deltas, first.stop)
+        for metric, curve in curves.items():
+            values = curve.at(self.deltas)
+            defined = ~np.isnan(values)
+            counts = self.counts[metric]
+            means = self.means[metric]
+            counts[defined] += 1
+            deviations = values[defined] - means[defined]
+            means[defined] += deviations / counts[defined]
+            self.squared_deviations[metric][defined] += deviations * (
+                values[defined] - means[defined]
+            )
+            if metric in self.histograms:
+                bins = np.clip(
+                    (values[defined] * self.n_bins).astype(np.int64), 0, self.n_bins - 1
+                )
+                np.add.at(self.histograms[metric], (np.flatnonzero(defined), bins), 1)
+        self.n_runs += 1
+        if self.curves is not None:
+            self.curves.append(scores)
+
+    def mean(self, metric: str = "f1") -> ResponseCurve:
+        """
+        Get the mean curve of the given metric.
+
+        :param metric: the metric
+        :return: the mean curve, undefined where no run has a defined score
+        """
+        counts = self.counts[metric]
+        means = np.where(counts > 0, self.means[metric], np.nan)
+        return ResponseCurve(self.deltas, means, self.stop)
+
+    def std(self, metric: str = "f1") -> ResponseCurve:
+        """
+        Get the standard deviation curve of the given metric.
+
+        :param metric: the metric
+        :return: the standard deviation curve, undefined where no run has a defined score
+        """
+        counts = self.counts[metric]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stds = np.sqrt(self.squared_deviations[metric] / counts)
+        return ResponseCurve(self.deltas, np.where(counts > 0, stds, np.nan), self.stop)
+
+    def quantile(self, q: float, metric: str = "f1") -> ResponseCurve:
+        """
+        Estimate the quantile curve of the given ratio metric from its sketch, interpolating linearly within the bins.
+
+        :param q: the quantile between 0 and 1
+        :param metric: the ratio metric
+        :return: the quantile curve, undefined where no run has a defined score
+        """
+        if metric not in self.histograms:
+            raise ValueError(f"No quantile sketch of {metric}, requires n_bins")
+        histogram = self.histograms[metric]
+        counts = self.counts[metric]
+        cumulative = np.cumsum(histogram, axis=1)
+        rank = q * counts
+        # the first non-empty bin reaching the rank and the fraction of its scores below the rank
+        index = np.minimum(
+            ((cumulative < rank[:, None]) | (cumulative == 0)).sum(axis=1),
+            self.n_bins - 1,
+        )
+        rows = np.arange(len(index))
+        below = cumulative[rows, index] - histogram[rows, index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.clip((rank - below) / histogram[rows, index], 0, 1)
+        quantiles = (index + np.nan_to_num(fraction)) / self.n_bins
+        return ResponseCurve(
+            self.deltas, np.where(counts > 0, quantiles, np.nan), self.stop
+        )
+
+    def _expand(self, deltas: np.ndarray, stop: int):
+        """
+        Expand the summary to the union of its breakpoints and the given breakpoints. The summary holds no scores
+        beyond the end of all previous curves.
+
+        :param deltas: the breakpoints of the added curve
+        :param stop: the end of the added curve
+        """
+        if self.deltas is None:
+            self.deltas = deltas.copy()
+            self.stop = stop
+            for metric in self.metrics:
+                self.counts[metric] = np.zeros(len(deltas), dtype=np.int64)
+                self.means[metric] = np.zeros(len(deltas))
+                self.squared_deviations[metric] = np.zeros(len(deltas))
+                if self.n_bins is not None and metric in RATIO_METRICS:
+                    self.histograms[metric] = np.zeros(
+                        (len(deltas), self.n_bins), dtype=np.int64
+                    )
+            return
+        union = np.unique(
+            np.concatenate(
+                [self.deltas, deltas, [min(stop, self.stop)]]
+                if stop != self.stop
+                else [self.deltas, deltas]
+            )
+        )
+        if len(union) == len(self.deltas) and stop <= self.stop:
+            return
+        index = np.searchsorted(self.deltas, union, side="right") - 1
+        # the breakpoints beyond the previous end take the empty state appended below
+        index[union >= self.stop] = len(self.deltas)
+        for states in [
+            self.counts,
+            self.means,
+            self.squared_deviations,
+            self.histograms,
+        ]:
+            for metric, state in states.items():
+                empty = np.zeros((1,) + state.shape[1:], dtype=state.dtype)
+                states[metric] = np.concatenate([state, empty])[index]
+        self.deltas = union
+        self.stop = max(stop, self.stop)
@@ -1,18 +1,54 @@
-from metrics.intervals import match_intervals
-from metrics.utils import ground_truth_to_time_stamps, prediction_to_time_stamps
-from metrics.scores import get_f1_scores
+from metrics.intervals import match_interval_tables
+from metrics.response_curve import ResponseTable
+from metrics.utils import ground_truth_to_table, prediction_to_table
+from metrics.scores import get_f1_scores, get_response_table, get_response_tables
 
 
-def evaluate(ground_truth, predictions) -> list:
+def evaluate(ground_truth, predictions, dense: bool = True, weight: float = 0.5):
     """
     Evaluate the concept drift.
 
-    :param ground_truth: the ground truth of the concept drift
-    :param predictions: the predictions given by the concept drift detector
+    :param ground_truth: the ground truth of the concept drift, either Events or a boolean sequence
+    :param predictions: the predictions given by the concept drift detector, either Events or a boolean sequence
+    :param dense: return a list with one score per Delta_max, else a ResponseCurve
+    :param weight: the weight of the time to adaptation in the time to response, see get_time_to_response
     :return: the delta max scores of the detection
     """
-    ground_truth_intervals = ground_truth_to_time_stamps(ground_truth)
-    prediction_intervals = prediction_to_time_stamps(predictions)
-    match_intervals(ground_truth_intervals, prediction_intervals)
+    if not dense:
+        return evaluate_table(ground_truth, predictions, weight)["f1"]
+    ground_truth_intervals = ground_truth_to_table(ground_truth)
+    prediction_intervals = prediction_to_table(predictions)
+    match_interval_tables(ground_truth_intervals, prediction_intervals, weight)
     scores = get_f1_scores(ground_truth_intervals, prediction_intervals)
     return scores
+
+
+def evaluate_table(ground_truth, predictions, weight: float = 0.5) -> ResponseTable:
+    """
+    Evaluate the concept drift by all metrics in one pass, see metrics.scores.get_response_table.
+
+    :param ground_truth: the ground truth of the concept drift, either Events or a boolean sequence
+    :param predictions: the predictions given by the concept drift detector, either Events or a boolean sequence
+    :param weight: the weight of the time to adaptation in the time to response, see get_time_to_response
+    :return: the response table
+    """
+    ground_truth_intervals = ground_truth_to_table(ground_truth)
+    prediction_intervals = prediction_to_table(predictions)
+    match_interval_tables(ground_truth_intervals, prediction_intervals, weight)
+    return get_response_table(ground_truth_intervals, prediction_intervals)
+
+
+def evaluate_weights(ground_truth, predictions, weights) -> list[ResponseTable]:
+    """
+    Evaluate the concept drift for multiple weights of the time to adaptation in the time to response with a single
+    matching of the intervals, see metrics.scores.get_response_tables.
+
+    :param ground_truth: the ground truth of the concept drift, either Events or a boolean sequence
+    :param predictions: the predictions given by the concept drift detector, either Events or a boolean sequence
+    :param weights: the weights, from 0 for the time to detection only to 1 for the time to adaptation only
+    :return: the response table of each weight
+    """
+    ground_truth_intervals = ground_truth_to_table(ground_truth)
+    prediction_intervals = prediction_to_table(predictions)
+    match_interval_tables(ground_truth_intervals, prediction_intervals)
+    return get_response_tables(ground_truth_intervals, prediction_intervals, weights)
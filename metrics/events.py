@@ -0,0 +1,93 @@
+"""This module provides a compact representation of boolean sequences such as drift labels and detections."""
+
+import numpy as np
+
+
+class Events:
+    """
+    A boolean sequence stored as its runs of consecutive True values. Drift labels and detections are True for only a
+    few observations, so the memory and the evaluation scale with the number of events instead of the length of the
+    data stream.
+    """
+
+    def __init__(self):
+        """
+        Init a new, empty Events instance.
+        """
+        self.n = 0
+        self.starts = []
+        self.ends = []
+
+    @classmethod
+    def from_sequence(cls, values) -> "Events":
+        """
+        Create the events of the given boolean sequence.
+
+        :param values: the boolean sequence
+        :return: the events
+        """
+        events = cls()
+        events.extend(values)
+        return events
+
+    def __len__(self) -> int:
+        return self.n
+
+    def append(self, value: bool):
+        """
+        Append a single value.
+
+        :param value: the value
+        """
+        if value:
+            if self.ends and self.ends[-1] == self.n:
+                self.ends[-1] += 1
+            else:
+                self.starts.append(self.n)
+                self.ends.append(self.n + 1)
+        self.n += 1
+
+    def extend(self, values):
+        """
+        Append a block of values.
+
+        :param values: the boolean values
+        """
+        values = np.asarray(values, dtype=bool)
+        offset = self.n
+        self.n += len(values)
+        if not values.any():
+            return
+        changes = np.diff(values.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(changes == 1) + offset
+        ends = np.flatnonzero(changes == -1) + offset
+        if self.ends and self.ends[-1] == offset and starts[0] == offset:
+            # the run continues from the previous block
+            self.ends[-1] = int(ends[0])
+            starts = starts[1:]
+            ends = ends[1:]
+        self.starts += starts.tolist()
+        self.ends += ends.tolist()
+
+    def get_indices(self) -> np.ndarray:
+        """
+        Get the indices of all True values.
+
+        :return: the sorted indices
+        """
+        if not self.starts:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(
+            [np.arange(start, end) for start, end in zip(self.starts, self.ends)]
+        )
+
+    def get_change_points(self) -> np.ndarray:
+        """
+        Get the indices at which the value differs from the previous value, i.e. the starts and ends of the runs
+        within the sequence.
+
+        :return: the sorted indices
+        """
+        starts = np.asarray(self.starts, dtype=np.int64)
+        ends = np.asarray(self.ends, dtype=np.int64)
+        return np.sort(np.concatenate([starts[starts > 0], ends[ends < self.n]]))
@@ -4,6 +4,19 @@ from dataclasses import dataclass, field
 import numpy as np
 
 
+def get_time_to_response(time_to_detection, time_to_adaptation, weight=0.5):
+    """
+    Get the time to response, i.e. the weighted average of the time to detection and the time to adaptation.
+
+    :param time_to_detection: the time to detection
+    :param time_to_adaptation: the time to adaptation
+    :param weight: the weight of the time to adaptation, 0 for the time to detection only, 1 for the time to adaptation
+        only
+    :return: the time to response
+    """
+    return (1 - weight) * time_to_detection + weight * time_to_adaptation
+
+
 @dataclass
 class Interval(ABC):
     """
@@ -14,12 +27,16 @@ class Interval(ABC):
     time_to_detection = np.NAN
     time_to_adaptation = np.NAN
     time_to_response = np.NAN
+    # the weight of the time to adaptation in the time to response
+    weight = 0.5
 
     def _set_time_to_response(self):
         """
         Set the time to response.
         """
-        self.time_to_response = (self.time_to_detection + self.time_to_adaptation) / 2
+        self.time_to_response = get_time_to_response(
+            self.time_to_detection, self.time_to_adaptation, self.weight
+        )
 
     def set(self, time_to_detection, time_to_adaptation):
         """
@@ -84,12 +101,16 @@ class PredictionInterval(Interval):
 def match_intervals(
     ground_truth_intervals: list[GroundTruthInterval],
     prediction_intervals: list[PredictionInterval],
+    weight: float = 0.5,
 ):
     """
     Matches the ground truth and predictions to determine true positives, false positives and false negatives.
     :param ground_truth_intervals: the ground truth
     :param prediction_intervals: the prediction
+    :param weight: the weight of the time to adaptation in the time to response, see get_time_to_response
     """
+    for interval in ground_truth_intervals + prediction_intervals:
+        interval.weight = weight
     for ground_truth in ground_truth_intervals:
         for prediction in prediction_intervals:
             if ground_truth.start <= prediction.start < ground_truth.next_start:
@@ -128,3 +149,110 @@ def link_ground_truths(ground_truths: list[GroundTruthInterval]):
     """
     for i in range(len(ground_truths) - 1):
         ground_truths[i].next_start = ground_truths[i + 1].start
+
+
+GROUND_TRUTH_DTYPE = np.dtype(
+    [
+        ("start", np.int64),
+        ("end", np.int64),
+        ("time_to_detection", np.float64),
+        ("time_to_adaptation", np.float64),
+        ("time_to_response", np.float64),
+        ("detected", np.bool_),
+        ("n_predictions", np.int64),
+    ]
+)
+
+PREDICTION_DTYPE = np.dtype(
+    [
+        ("start", np.int64),
+        ("end", np.int64),
+        ("time_to_detection", np.float64),
+        ("time_to_adaptation", np.float64),
+        ("time_to_response", np.float64),
+        ("true_positive", np.bool_),
+        ("ground_truth", np.int64),
+    ]
+)
+
+
+def make_interval_table(starts, ends, dtype: np.dtype) -> np.ndarray:
+    """
+    Make a table of intervals, i.e. a structured array with one row per interval, of the given dtype. The times are
+    undefined and no interval is linked.
+
+    :param starts: the start time steps of the intervals
+    :param ends: the end time steps of the intervals
+    :param dtype: GROUND_TRUTH_DTYPE or PREDICTION_DTYPE
+    :return: the table
+    """
+    table = np.zeros(len(starts), dtype=dtype)
+    table["start"] = starts
+    table["end"] = ends
+    table["time_to_detection"] = np.nan
+    table["time_to_adaptation"] = np.nan
+    table["time_to_response"] = np.nan
+    if "ground_truth" in dtype.names:
+        table["ground_truth"] = -1
+    return table
+
+
+def match_interval_tables(
+    ground_truths: np.ndarray, predictions: np.ndarray, weight: float = 0.5
+):
+    """
+    Matches the tables of ground truth and prediction intervals in place, following the rules of match_intervals and
+    link_ground_truth_and_prediction. Each prediction is assigned to the last ground truth starting at or before it by
+    a binary search. It is linked if it is the first prediction assigned to the ground truth or if it starts before the
+    ground truth ends. The times of a ground truth are the mean times of its linked predictions.
+
+    :param ground_truths: the ground truth table, sorted by start
+    :param predictions: the prediction table, sorted by start
+    :param weight: the weight of the time to adaptation in the time to response, see get_time_to_response
+    """
+    if len(ground_truths) == 0 or len(predictions) == 0:
+        return
+    ground_truth = (
+        np.searchsorted(ground_truths["start"], predictions["start"], side="right") - 1
+    )
+    assigned = ground_truth >= 0
+    ground_truth = np.maximum(ground_truth, 0)
+    first = np.searchsorted(predictions["start"], ground_truths["start"], side="left")
+    is_first = first[ground_truth] == np.arange(len(predictions))
+    linked = assigned & (
+        is_first | (predictions["start"] < ground_truths["end"][ground_truth])
+    )
+    ground_truth = ground_truth[linked]
+
+    time_to_detection = (
+        predictions["start"][linked] - ground_truths["start"][ground_truth]
+    )
+    time_to_adaptation = np.abs(
+        predictions["end"][linked] - ground_truths["end"][ground_truth]
+    )
+    predictions["time_to_detection"][linked] = time_to_detection
+    predictions["time_to_adaptation"][linked] = time_to_adaptation
+    predictions["time_to_response"][linked] = get_time_to_response(
+        predictions["time_to_detection"][linked],
+        predictions["time_to_adaptation"][linked],
+        weight,
+    )
+    predictions["true_positive"][linked] = True
+    predictions["ground_truth"][linked] = ground_truth
+
+    n_predictions = np.bincount(ground_truth, minlength=len(ground_truths))
+    detected = n_predictions > 0
+    ground_truths["n_predictions"] = n_predictions
+    ground_truths["detected"] = detected
+    for time, times in [
+        ("time_to_detection", time_to_detection),
+        ("time_to_adaptation", time_to_adaptation),
+    ]:
+        # the sums of integers are exact, hence the means equal those of GroundTruthInterval.finalize
+        sums = np.bincount(ground_truth, weights=times, minlength=len(ground_truths))
+        ground_truths[time][detected] = sums[detected] / n_predictions[detected]
+    ground_truths["time_to_response"][detected] = get_time_to_response(
+        ground_truths["time_to_detection"][detected],
+        ground_truths["time_to_adaptation"][detected],
+        weight,
+    )
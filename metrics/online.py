@@ -0,0 +1,251 @@
+"""This module provides an evaluation of concept drift detectors which consumes the drifts and detections online."""
+
+import bisect
+import math
+from collections import defaultdict, deque
+from typing import Optional
+
+import numpy as np
+
+from metrics.intervals import get_time_to_response
+from metrics.response_curve import ResponseCurve, ResponseTable
+from metrics.scores import get_response_table_from_counts
+
+
+class OnlineEvaluator:
+    """
+    OnlineEvaluator evaluates a concept drift detector while the data stream is processed. Intervals are formed from
+    the change points of the ground truth and the predictions as in metrics.eval.evaluate, and predictions are linked
+    to ground truths by the rules of match_intervals as soon as they end. A ground truth is finalized once the next one
+    has ended, as no later prediction can be linked to it. Only the counts of detected drifts and correct predictions
+    and the sums of their times per time to response are kept, so the memory is independent of the length of the stream.
+    """
+
+    def __init__(self, weight: float = 0.5):
+        """
+        Init a new OnlineEvaluator.
+
+        :param weight: the weight of the time to adaptation in the time to response, see get_time_to_response
+        """
+        self.weight = weight
+        self.n = 0
+        self.ground_truth = _ChangePoints()
+        self.prediction = _ChangePoints()
+        # the ground truths whose linked predictions may still change
+        self.active = deque()
+        # the starts of the active ground truths, to search the ground truth of a prediction
+        self.starts = deque()
+        self.n_ground_truths = 0
+        self.n_predictions = 0
+        # the numbers of detected drifts and correct predictions and the sums of the mean times to detection,
+        # adaptation and response of the detected drifts by ceiled time to response
+        self.counts = defaultdict(lambda: [0, 0, 0.0, 0.0, 0.0])
+
+    def update(self, drift: bool, detected: bool):
+        """
+        Update the evaluator with a single observation.
+
+        :param drift: True if the observation belongs to a drift
+        :param detected: True if the detector detected a drift at the observation
+        """
+        self.update_many(np.array([drift]), np.array([detected]))
+
+    def update_many(self, drifts, detections):
+        """
+        Update the evaluator with a block of observations.
+
+        :param drifts: the boolean drift labels
+        :param detections: the boolean detections, of the same length as the drift labels
+        """
+        drifts = np.asarray(drifts, dtype=bool)
+        detections = np.asarray(detections, dtype=bool)
+        if len(drifts) != len(detections):
+            raise ValueError("drifts and detections must have the same length")
+        for start, end in self.ground_truth.extend(drifts):
+            if end is None:
+                self.active.append(_GroundTruth(start))
+                self.starts.append(start)
+            else:
+                self.active[-1].close(end)
+        for start, end in self.prediction.extend(detections):
+            if end is not None:
+                self._link(start, end)
+        self.n += len(drifts)
+        self._finalize()
+
+    def get_curve(self) -> ResponseCurve:
+        """
+        Get the F1 response curve of the observations so far. It equals the curve evaluate(..., dense=False) returns
+        for the drift labels and detections up to now.
+
+        :return: the response curve
+        """
+        return self.get_table()["f1"]
+
+    def get_table(self) -> ResponseTable:
+        """
+        Get the response curves of all metrics of the observations so far, see get_curve and
+        metrics.scores.get_response_table_from_counts.
+
+        :return: the response table
+        """
+        counts = defaultdict(
+            lambda: [0, 0, 0.0, 0.0, 0.0], {t: list(c) for t, c in self.counts.items()}
+        )
+        n_ground_truths = self.n_ground_truths
+        closed = list(self.active)
+        if closed and closed[-1].end is None:
+            # an unfinished drift does not count yet, its first prediction may be linked to the previous drift
+            unfinished = closed.pop()
+            if closed and closed[-1].n_linked == 0 and unfinished.first is not None:
+                closed[-1] = closed[-1].copy()
+                closed[-1].link(*unfinished.first)
+        for ground_truth in closed:
+            n_ground_truths += 1
+            ground_truth.count(counts, self.weight)
+        thresholds = np.array(list(counts), dtype=np.int64)
+        values = np.array(list(counts.values()), dtype=float).reshape(-1, 5)
+        return get_response_table_from_counts(
+            thresholds,
+            values[:, 0].astype(np.int64),
+            values[:, 1].astype(np.int64),
+            values[:, 2],
+            values[:, 3],
+            values[:, 4],
+            n_ground_truths,
+            self.n_predictions,
+        )
+
+    def _link(self, start: int, end: int):
+        """
+        Link the prediction to the last ground truth starting at or before it, following
+        link_ground_truth_and_prediction.
+
+        :param start: the start time step of the prediction
+        :param end: the end time step of the prediction
+        """
+        self.n_predictions += 1
+        i = bisect.bisect_right(self.starts, start) - 1
+        if i < 0:
+            return
+        ground_truth = self.active[i]
+        if ground_truth.first is None:
+            ground_truth.first = (start, end)
+        if (
+            ground_truth.n_linked == 0
+            or ground_truth.end is None
+            or start < ground_truth.end
+        ):
+            ground_truth.link(start, end)
+
+    def _finalize(self):
+        """
+        Finalize the ground truths whose range ends at the start of a ground truth which has already ended, unless an
+        unfinished prediction started within their range.
+        """
+        while (
+            len(self.active) > 1
+            and self.active[1].end is not None
+            and (
+                self.prediction.start is None
+                or self.prediction.start >= self.active[1].start
+            )
+        ):
+            self.active.popleft().count(self.counts, self.weight)
+            self.starts.popleft()
+            self.n_ground_truths += 1
+
+
+class _GroundTruth:
+    """
+    A ground truth interval and the sums of the times of its linked predictions. While the drift has not ended, the
+    linked predictions ended before the drift does, so the times to adaptation are summed from the prediction ends.
+    """
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = None
+        self.n_linked = 0
+        self.time_to_detection = 0
+        self.time_to_adaptation = 0
+        self.prediction_ends = 0
+        # the first prediction starting within the range of the ground truth
+        self.first: Optional[tuple[int, int]] = None
+
+    def copy(self) -> "_GroundTruth":
+        ground_truth = _GroundTruth(self.start)
+        ground_truth.__dict__.update(self.__dict__)
+        return ground_truth
+
+    def close(self, end: int):
+        self.end = end
+        self.time_to_adaptation += self.n_linked * end - self.prediction_ends
+
+    def link(self, start: int, end: int):
+        self.n_linked += 1
+        self.time_to_detection += start - self.start
+        if self.end is None:
+            self.prediction_ends += end
+        else:
+            self.time_to_adaptation += abs(end - self.end)
+
+    def count(self, counts: dict, weight: float):
+        """
+        Add the ground truth to the counts of detected drifts and correct predictions and the sums of the mean times
+        by ceiled time to response.
+
+        :param counts: the counts
+        :param weight: the weight of the time to adaptation in the time to response
+        """
+        if self.n_linked == 0:
+            return
+        # the sums of integers are exact, hence the means equal those of match_interval_tables
+        time_to_detection = self.time_to_detection / self.n_linked
+        time_to_adaptation = self.time_to_adaptation / self.n_linked
+        time_to_response = get_time_to_response(
+            time_to_detection, time_to_adaptation, weight
+        )
+        threshold = math.ceil(time_to_response)
+        counts[threshold][0] += 1
+        counts[threshold][1] += self.n_linked
+        counts[threshold][2] += time_to_detection
+        counts[threshold][3] += time_to_adaptation
+        counts[threshold][4] += time_to_response
+
+
+class _ChangePoints:
+    """
+    The change points of a boolean sequence which is extended block by block. The change points alternately start
+    and end an interval, as in metrics.utils.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.last = False
+        # the start of the unfinished interval, or None
+        self.start = None
+
+    def extend(self, values: np.ndarray) -> list[tuple[int, Optional[int]]]:
+        """
+        Extend the sequence by the given values.
+
+        :param values: the boolean values
+        :return: a tuple (start, None) for each started interval and (start, end) for each ended interval
+        """
+        if self.n == 0:
+            changes = np.flatnonzero(values[1:] != values[:-1]) + 1
+        else:
+            changes = np.flatnonzero(np.diff(values, prepend=self.last))
+        changes = (changes + self.n).tolist()
+        self.n += len(values)
+        if len(values) > 0:
+            self.last = bool(values[-1])
+        intervals = []
+        for change in changes:
+            if self.start is None:
+                self.start = change
+                intervals.append((change, None))
+            else:
+                intervals.append((self.start, change))
+                self.start = None
+        return intervals
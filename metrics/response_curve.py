@@ -0,0 +1,195 @@
+"""This module provides a compact representation of response curves, i.e. scores as step functions of Delta_max."""
+
+import warnings
+from typing import Optional
+
+import numpy as np
+
+# the metrics bounded by 1, all metrics are non-negative
+RATIO_METRICS = ("f1", "recall", "precision")
+
+
+class ResponseCurve:
+    """
+    A response curve stored as the values of Delta_max at which the score changes and the score from each of them up
+    to the next one. The curve is defined for the integer values of Delta_max from 0 to stop - 1, so it matches a dense
+    list of stop scores without repeating values.
+    """
+
+    def __init__(self, deltas, values, stop: Optional[int] = None):
+        """
+        Init a new ResponseCurve.
+
+        :param deltas: the increasing values of Delta_max at which the score changes, starting at 0
+        :param values: the score from each value of Delta_max up to the next one
+        :param stop: the first value of Delta_max for which the curve is undefined, by default the last breakpoint + 1
+        """
+        self.deltas = np.asarray(deltas, dtype=np.int64)
+        self.values = np.asarray(values, dtype=float)
+        self.stop = int(self.deltas[-1]) + 1 if stop is None else int(stop)
+
+    @classmethod
+    def from_dense(cls, scores) -> "ResponseCurve":
+        """
+        Create the response curve of a dense list of scores with one score per Delta_max.
+
+        :param scores: the scores for Delta_max from 0 to len(scores) - 1
+        :return: the response curve
+        """
+        scores = np.asarray(scores, dtype=float)
+        with np.errstate(invalid="ignore"):
+            unchanged = (scores[1:] == scores[:-1]) | (
+                np.isnan(scores[1:]) & np.isnan(scores[:-1])
+            )
+        deltas = np.concatenate(([0], np.flatnonzero(~unchanged) + 1))
+        return cls(deltas, scores[deltas], len(scores))
+
+    def __len__(self) -> int:
+        return self.stop
+
+    def __repr__(self) -> str:
+        return f"ResponseCurve(breakpoints={len(self.deltas)}, stop={self.stop})"
+
+    def at(self, delta_max, extend: bool = False) -> np.ndarray:
+        """
+        Evaluate the curve on the given values of Delta_max, e.g. a log-spaced grid or a capped horizon.
+
+        :param delta_max: the values of Delta_max, non-integer values are evaluated at the preceding integer
+        :param extend: extend the curve beyond its end by its last score, else the scores beyond its end are undefined
+        :return: the scores, NaN where the curve is undefined
+        """
+        delta_max = np.asarray(delta_max)
+        indices = np.searchsorted(self.deltas, delta_max, side="right") - 1
+        scores = self.values[np.maximum(indices, 0)]
+        undefined = indices < 0
+        if not extend:
+            undefined |= delta_max >= self.stop
+        return np.where(undefined, np.nan, scores)
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Get the dense scores with one score per Delta_max.
+
+        :return: the scores for Delta_max from 0 to stop - 1
+        """
+        return np.repeat(self.values, np.diff(self.deltas, append=self.stop))
+
+    def get_area(self, stop: int) -> float:
+        """
+        Get the area under the curve, i.e. the sum of the scores for the integer values of Delta_max from 0 to stop -
+        1. Undefined scores count as 0 and the curve is extended beyond its end by its last score, as it remains
+        constant once every drift is detected.
+
+        :param stop: the end of the summed range of Delta_max
+        :return: the area
+        """
+        values = np.nan_to_num(self.values, nan=0.0)
+        bounds = np.minimum(np.append(self.deltas, self.stop), stop)
+        area = np.sum(values * np.maximum(np.diff(bounds), 0))
+        return float(area + values[-1] * max(0, stop - self.stop))
+
+    @staticmethod
+    def mean(curves: list["ResponseCurve"]) -> "ResponseCurve":
+        """
+        Get the mean of the given curves for each Delta_max, ignoring curves which are undefined for it.
+
+        :param curves: the curves, e.g. of multiple runs
+        :return: the mean curve
+        """
+        deltas, values, stop = _align(curves)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return ResponseCurve(deltas, np.nanmean(values, axis=0), stop)
+
+    @staticmethod
+    def std(curves: list["ResponseCurve"]) -> "ResponseCurve":
+        """
+        Get the standard deviation of the given curves for each Delta_max, ignoring curves which are undefined for it.
+
+        :param curves: the curves, e.g. of multiple runs
+        :return: the standard deviation curve
+        """
+        deltas, values, stop = _align(curves)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return ResponseCurve(deltas, np.nanstd(values, axis=0), stop)
+
+
+class ResponseTable:
+    """
+    Multiple response curves of one evaluation sharing their breakpoints, e.g. the F1 score, recall, precision and the
+    mean times to detection and adaptation of the detected drifts, see metrics.scores.get_response_table.
+    """
+
+    def __init__(
+        self, deltas, columns: dict[str, np.ndarray], stop: Optional[int] = None
+    ):
+        """
+        Init a new ResponseTable.
+
+        :param deltas: the increasing values of Delta_max at which any metric changes, starting at 0
+        :param columns: the values of each metric from each value of Delta_max up to the next one by name
+        :param stop: the first value of Delta_max for which the curves are undefined, by default the last breakpoint +
+            1
+        """
+        self.deltas = np.asarray(deltas, dtype=np.int64)
+        self.columns = {
+            metric: np.asarray(values, dtype=float)
+            for metric, values in columns.items()
+        }
+        self.stop = int(self.deltas[-1]) + 1 if stop is None else int(stop)
+
+    def __len__(self) -> int:
+        return self.stop
+
+    def __repr__(self) -> str:
+        return (
+            f"ResponseTable(metrics={list(self.columns)}, breakpoints={len(self.deltas)}, "
+            f"stop={self.stop})"
+        )
+
+    def __contains__(self, metric: str) -> bool:
+        return metric in self.columns
+
+    def __getitem__(self, metric: str) -> ResponseCurve:
+        """
+        Get the response curve of the given metric.
+
+        :param metric: the name of the metric
+        :return: the response curve
+        """
+        return ResponseCurve(self.deltas, self.columns[metric], self.stop)
+
+
+def to_response_curve(scores, metric: str = "f1") -> ResponseCurve:
+    """
+    Convert the given scores to a response curve.
+
+    :param scores: a response table, a response curve or a dense list of F1 scores
+    :param metric: the metric of a response table, response curves and lists only contain the F1 score
+    :return: the response curve
+    """
+    if isinstance(scores, ResponseTable):
+        return scores[metric]
+    if metric != "f1":
+        raise ValueError(f"Only response tables contain the metric {metric}")
+    if isinstance(scores, ResponseCurve):
+        return scores
+    return ResponseCurve.from_dense(scores)
+
+
+def _align(curves: list[ResponseCurve]) -> (np.ndarray, np.ndarray, int):
+    """
+    Evaluate the given curves on the union of their breakpoints and ends.
+
+    :param curves: the curves
+    :return: a tuple containing the breakpoints, the scores with shape (n_curves, n_breakpoints) and the largest end
+    """
+    stop = max(curve.stop for curve in curves)
+    deltas = np.unique(
+        np.concatenate(
+            [curve.deltas for curve in curves]
+            + [[curve.stop] for curve in curves if curve.stop < stop]
+        )
+    )
+    return deltas, np.stack([curve.at(deltas) for curve in curves]), stop
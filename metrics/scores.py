@@ -1,6 +1,8 @@
-import math
 import numpy as np
 
+from metrics.intervals import get_time_to_response
+from metrics.response_curve import ResponseTable
+
 
 def get_f1_scores(ground_truth_intervals, prediction_intervals) -> list:
     """
@@ -8,33 +10,179 @@ def get_f1_scores(ground_truth_intervals, prediction_intervals) -> list:
 
     :param ground_truth_intervals: the ground truth
     :param prediction_intervals: the prediction
-    :return: a list of F1 scores
+    :return: a list of F1 scores, one for each Delta_max from 0 to the largest time to response
+    """
+    deltas, scores = get_f1_breakpoints(ground_truth_intervals, prediction_intervals)
+    lengths = np.diff(deltas, append=deltas[-1] + 1)
+    return np.repeat(scores, lengths).tolist()
+
+
+def get_f1_breakpoints(
+    ground_truth_intervals, prediction_intervals
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the F1 scores for the given ground truth and prediction at the values of Delta_max at which they change, see
+    get_response_table.
+
+    :param ground_truth_intervals: the ground truth, either a list of GroundTruthInterval or a ground truth table
+    :param prediction_intervals: the prediction, either a list of PredictionInterval or a prediction table
+    :return: the increasing values of Delta_max starting at 0 and the F1 score from each of them up to the next one
+    """
+    table = get_response_table(ground_truth_intervals, prediction_intervals)
+    return table.deltas, table.columns["f1"]
+
+
+def get_response_table(ground_truth_intervals, prediction_intervals) -> ResponseTable:
     """
-    ground_truth_response_times = np.array(
-        [interval.time_to_response for interval in ground_truth_intervals]
+    Get the response curves of all metrics for the given ground truth and prediction. The metrics only change once
+    Delta_max reaches the time to response of a detected drift, so they are computed from the sorted times to response
+    and the cumulative numbers of true positives and correct predictions.
+
+    :param ground_truth_intervals: the ground truth, either a list of GroundTruthInterval or a ground truth table
+    :param prediction_intervals: the prediction, either a list of PredictionInterval or a prediction table
+    :return: the response table, see get_response_table_from_counts
+    """
+    times, n_predictions = _get_ground_truth_times(ground_truth_intervals)
+    detected = ~np.isnan(times["time_to_response"])
+    # a drift counts as true positive for every integer Delta_max of at least the ceiled time to response
+    thresholds = np.ceil(times["time_to_response"][detected]).astype(np.int64)
+    return get_response_table_from_counts(
+        thresholds,
+        np.ones(len(thresholds), dtype=np.int64),
+        n_predictions[detected],
+        times["time_to_detection"][detected],
+        times["time_to_adaptation"][detected],
+        times["time_to_response"][detected],
+        len(ground_truth_intervals),
+        len(prediction_intervals),
     )
-    delta_max = math.ceil(np.nanmax(ground_truth_response_times))
-    scores = []
-    for delta in range(delta_max + 1):
-        true_positives = sum(ground_truth_response_times <= delta)
-        false_positives = get_false_positives(
-            ground_truth_intervals, prediction_intervals, delta
+
+
+def get_response_tables(
+    ground_truth_intervals, prediction_intervals, weights
+) -> list[ResponseTable]:
+    """
+    Get the response tables for multiple weights of the time to adaptation in the time to response. Matching the
+    intervals does not depend on the weight, so the times to detection and adaptation of one matching are reused and
+    only the times to response are sorted and accumulated for each weight.
+
+    :param ground_truth_intervals: the matched ground truth, either a list of GroundTruthInterval or a ground truth
+        table
+    :param prediction_intervals: the matched prediction, either a list of PredictionInterval or a prediction table
+    :param weights: the weights, see metrics.intervals.get_time_to_response
+    :return: the response table of each weight
+    """
+    times, n_predictions = _get_ground_truth_times(ground_truth_intervals)
+    detected = ~np.isnan(times["time_to_response"])
+    time_to_detection = times["time_to_detection"][detected]
+    time_to_adaptation = times["time_to_adaptation"][detected]
+    weights = np.asarray(weights, dtype=float)
+    times_to_response = get_time_to_response(
+        time_to_detection[None, :], time_to_adaptation[None, :], weights[:, None]
+    )
+    return [
+        get_response_table_from_counts(
+            np.ceil(time_to_response).astype(np.int64),
+            np.ones(len(time_to_response), dtype=np.int64),
+            n_predictions[detected],
+            time_to_detection,
+            time_to_adaptation,
+            time_to_response,
+            len(ground_truth_intervals),
+            len(prediction_intervals),
         )
-        false_negatives = len(ground_truth_intervals) - true_positives
-        recall = true_positives / (true_positives + false_negatives)
+        for time_to_response in times_to_response
+    ]
+
+
+def _get_ground_truth_times(ground_truth_intervals) -> (dict, np.ndarray):
+    """
+    Get the times of the given ground truth intervals and their numbers of linked predictions.
+
+    :param ground_truth_intervals: either a list of GroundTruthInterval or a ground truth table
+    :return: a tuple containing the times to detection, adaptation and response by name and the numbers of predictions
+    """
+    names = ["time_to_detection", "time_to_adaptation", "time_to_response"]
+    if isinstance(ground_truth_intervals, np.ndarray):
+        return (
+            {name: ground_truth_intervals[name] for name in names},
+            ground_truth_intervals["n_predictions"],
+        )
+    times = {
+        name: np.array(
+            [getattr(interval, name) for interval in ground_truth_intervals],
+            dtype=float,
+        )
+        for name in names
+    }
+    n_predictions = np.array(
+        [len(interval.predictions) for interval in ground_truth_intervals],
+        dtype=np.int64,
+    )
+    return times, n_predictions
+
+
+def get_response_table_from_counts(
+    thresholds: np.ndarray,
+    n_detected: np.ndarray,
+    n_correct_predictions: np.ndarray,
+    times_to_detection: np.ndarray,
+    times_to_adaptation: np.ndarray,
+    times_to_response: np.ndarray,
+    n_ground_truths: int,
+    n_predictions: int,
+) -> ResponseTable:
+    """
+    Get the response curves of all metrics from the counts of detected drifts and correct predictions per ceiled time
+    to response. The table contains the columns:
+
+    - f1, recall and precision
+    - true_positives and false_positives, the numbers of detected drifts and of predictions not linked to them
+    - time_to_detection, time_to_adaptation and time_to_response, the mean times of the detected drifts
+
+    :param thresholds: the ceiled times to response
+    :param n_detected: the number of detected drifts per time to response
+    :param n_correct_predictions: the number of predictions linked to these drifts per time to response
+    :param times_to_detection: the sum of the times to detection of these drifts per time to response
+    :param times_to_adaptation: the sum of the times to adaptation of these drifts per time to response
+    :param times_to_response: the sum of the times to response of these drifts per time to response
+    :param n_ground_truths: the number of drifts
+    :param n_predictions: the number of predictions
+    :return: the response table
+    """
+    # the counts of equal thresholds are summed in their given order before accumulating them, so counts which are
+    # already summed per threshold, e.g. by OnlineEvaluator, yield identical results
+    thresholds, inverse = np.unique(thresholds, return_inverse=True)
+
+    def accumulate(values):
+        sums = np.bincount(inverse, weights=values, minlength=len(thresholds))
+        return np.concatenate(([0], np.cumsum(sums)))
+
+    deltas = np.unique(np.concatenate(([0], thresholds[thresholds > 0])))
+    index = np.searchsorted(thresholds, deltas, side="right")
+    true_positives = accumulate(n_detected)[index]
+    false_positives = n_predictions - accumulate(n_correct_predictions)[index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recall = true_positives / n_ground_truths
         precision = true_positives / (true_positives + false_positives)
-        if recall + precision > 0:
-            f1_score = 2 * (recall * precision) / (recall + precision)
-        else:
-            f1_score = np.nan
-        scores.append(f1_score)
-    return scores
-
-
-def get_false_positives(ground_truth_intervals, prediction_intervals, delta):
-    correct_predictions = []
-    for ground_truth in ground_truth_intervals:
-        if ground_truth.time_to_response <= delta:
-            correct_predictions += ground_truth.predictions
-    false_positives = len(prediction_intervals) - len(correct_predictions)
-    return false_positives
+        f1_scores = np.where(
+            recall + precision > 0,
+            2 * (recall * precision) / (recall + precision),
+            np.nan,
+        )
+        time_to_detection = accumulate(times_to_detection)[index] / true_positives
+        time_to_adaptation = accumulate(times_to_adaptation)[index] / true_positives
+        time_to_response = accumulate(times_to_response)[index] / true_positives
+    return ResponseTable(
+        deltas,
+        {
+            "f1": f1_scores,
+            "recall": recall,
+            "precision": precision,
+            "true_positives": true_positives,
+            "false_positives": false_positives,
+            "time_to_detection": time_to_detection,
+            "time_to_adaptation": time_to_adaptation,
+            "time_to_response": time_to_response,
+        },
+    )
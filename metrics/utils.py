@@ -1,9 +1,13 @@
 import numpy as np
 
+from metrics.events import Events
 from metrics.intervals import (
+    GROUND_TRUTH_DTYPE,
+    PREDICTION_DTYPE,
     GroundTruthInterval,
     PredictionInterval,
     link_ground_truths,
+    make_interval_table,
 )
 
 
@@ -28,7 +32,37 @@ def prediction_to_time_stamps(prediction: list[bool]) -> list[PredictionInterval
     return results
 
 
+def ground_truth_to_table(ground_truth) -> np.ndarray:
+    """
+    Get the table of ground truth intervals, see make_interval_table.
+
+    :param ground_truth: the ground truth, either Events or a boolean sequence
+    :return: the ground truth table
+    """
+    starts, ends = _get_interval_bounds(ground_truth)
+    return make_interval_table(starts, ends, GROUND_TRUTH_DTYPE)
+
+
+def prediction_to_table(prediction) -> np.ndarray:
+    """
+    Get the table of prediction intervals, see make_interval_table.
+
+    :param prediction: the prediction, either Events or a boolean sequence
+    :return: the prediction table
+    """
+    starts, ends = _get_interval_bounds(prediction)
+    return make_interval_table(starts, ends, PREDICTION_DTYPE)
+
+
+def _get_interval_bounds(set_) -> tuple[np.ndarray, np.ndarray]:
+    time_stamps = np.asarray(_get_change_time_stamps(set_), dtype=np.int64)
+    n_intervals = len(time_stamps) // 2
+    return time_stamps[0 : 2 * n_intervals : 2], time_stamps[1 : 2 * n_intervals : 2]
+
+
 def _get_change_time_stamps(set_: list[bool]):
+    if isinstance(set_, Events):
+        return list(set_.get_change_points())
     set_ = np.array(set_)
     changes = set_[1:] != set_[:-1]
     time_stamps = list(
@@ -1,28 +1,52 @@
+import hashlib
 import itertools
-import time
+import json
+from collections import Counter
 from typing import List, Optional
 
+import numpy as np
+from scipy.stats import qmc
+
 from optimization.parameter import Parameter
 
 
 class ConfigGenerator:
     """
-    A generator providing configurations based on a list of parameter values.
+    A generator providing configurations based on a list of parameter values. The configurations are either the full
+    grid of parameter values or a fixed budget of configurations sampled from the parameter space, see
+    Parameter.sample.
     """
 
-    def __init__(self, parameters: List[Parameter], seeds: Optional[List[int]] = None):
+    def __init__(
+        self,
+        parameters: List[Parameter],
+        seeds: Optional[List[int]] = None,
+        sampling: str = "grid",
+        budget: Optional[int] = None,
+        sampling_seed: int = 0,
+    ):
         """
         Init a new config generator with the given list of parameters and seeds (optional).
 
         :param parameters: the list of parameters
         :param seeds: the seeds or None
+        :param sampling: "grid" for all combinations of parameter values, or "random", "sobol" (scrambled Sobol
+            sequence) or "lhs" (Latin hypercube) to sample a budget of configurations
+        :param budget: the number of sampled configurations
+        :param sampling_seed: the seed of the sampling
         """
+        if sampling not in ("grid", "random", "sobol", "lhs"):
+            raise ValueError(f"Unknown sampling: {sampling}")
+        if sampling != "grid" and budget is None:
+            raise ValueError(f"Sampling {sampling} requires a budget")
         self.parameters = sorted(parameters, key=lambda p: p.name)
-        self.seeds = seeds
-        self.seeds_gen = self._seeds_generator()
-
-    def _seeds_generator(self):
-        yield from self.seeds
+        self.sampling = sampling
+        self.budget = budget
+        self.sampling_seed = sampling_seed
+        # the configurations are sampled once, so every run evaluates the same configurations
+        self.combinations = self._get_combinations()
+        # the seeds are indexed by run and configuration, so every pass yields the same seeds
+        self.seeds = list(seeds) if seeds is not None else None
 
     def get_parameter_names(self):
         """
@@ -34,21 +58,80 @@ class ConfigGenerator:
         names.insert(0, "seed")
         return names
 
+    def _get_combinations(self) -> list[tuple]:
+        """
+        Get the combinations of parameter values, either all combinations or the sampled ones.
+
+        :return: the combinations
+        """
+        if self.sampling == "grid":
+            all_parameters = [list(parameter) for parameter in self.parameters]
+            return list(itertools.product(*all_parameters))
+        n_dimensions = len(self.parameters)
+        if self.sampling == "random":
+            rng = np.random.default_rng(self.sampling_seed)
+            quantiles = rng.uniform(size=(self.budget, n_dimensions))
+        elif self.sampling == "sobol":
+            sampler = qmc.Sobol(n_dimensions, seed=self.sampling_seed)
+            quantiles = sampler.random(self.budget)
+        else:
+            sampler = qmc.LatinHypercube(n_dimensions, seed=self.sampling_seed)
+            quantiles = sampler.random(self.budget)
+        all_values = [
+            parameter.sample(quantiles[:, j])
+            for j, parameter in enumerate(self.parameters)
+        ]
+        return list(zip(*all_values))
+
     def __iter__(self):
         """
-        Creates all combinations of configurations from the parameters and yields them. If no seeds were provided,
-        the current UNIX time is used as seed instead.
+        Yields the configurations of the first run, see iter_run.
 
         :return: the configurations
         """
-        all_parameters = [list(parameter) for parameter in self.parameters]
-        for combination in itertools.product(*all_parameters):
-            config = {
+        return self.iter_run(0)
+
+    def iter_run(self, run: int):
+        """
+        Yields the combinations of parameter values as configurations of the given run. The provided seeds are assigned
+        run by run in the order of the combinations. If no seeds were provided, the seed is derived from the
+        configuration and the number of times it was generated before in this and the previous runs, see _get_seed.
+        Hence, every pass yields the same seeds for the same run.
+
+        :param run: the index of the run
+        :return: the configurations
+        """
+        configs = [
+            {
                 parameter.name: combination[j]
                 for j, parameter in enumerate(self.parameters)
             }
+            for combination in self.combinations
+        ]
+        canonicals = [
+            json.dumps(config, sort_keys=True, default=str) for config in configs
+        ]
+        multiplicities = Counter(canonicals)
+        occurrences = Counter()
+        for j, (config, canonical) in enumerate(zip(configs, canonicals)):
             if self.seeds is None:
-                config["seed"] = int(time.time())
+                occurrence = run * multiplicities[canonical] + occurrences[canonical]
+                occurrences[canonical] += 1
+                config["seed"] = self._get_seed(canonical, occurrence)
             else:
-                config["seed"] = next(self.seeds_gen)
+                config["seed"] = self.seeds[run * len(self.combinations) + j]
             yield config
+
+    @staticmethod
+    def _get_seed(canonical: str, occurrence: int) -> int:
+        """
+        Derive a seed from a hash of the given configuration and its number of occurrences. Hence, the seeds are
+        identical across passes and invocations, but differ between the runs of a configuration.
+
+        :param canonical: the configuration without seed as canonical JSON
+        :param occurrence: the number of previous occurrences of the configuration
+        :return: the seed
+        """
+        digest = hashlib.sha256(f"{canonical}#{occurrence}".encode()).hexdigest()
+        # seeds of scikit-learn must be below 2**32
+        return int(digest[:8], 16)
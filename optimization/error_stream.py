@@ -0,0 +1,88 @@
+"""This module provides cached prequential error sequences of a classifier for supervised drift detectors."""
+
+from collections import OrderedDict
+
+import numpy as np
+from river.tree import HoeffdingTreeClassifier
+
+
+class ErrorStream:
+    """
+    The prequential errors of a classifier trained from a given observation onwards. The errors are computed lazily, so
+    only the observations actually requested are predicted and learned.
+    """
+
+    def __init__(self, rows: list[tuple], reset: int):
+        """
+        Init a new ErrorStream.
+
+        :param rows: the observations as (x, y) tuples
+        :param reset: the index of the observation at which the classifier was replaced, it learns this observation
+            before predicting the next one, -1 for the initial classifier
+        """
+        self.rows = rows
+        self.start = reset + 1
+        self.classifier = HoeffdingTreeClassifier()
+        if reset >= 0:
+            self.classifier.learn_one(*rows[reset])
+        # one byte per error instead of a reference to a bool
+        self.errors = bytearray()
+
+    def __getitem__(self, index: int) -> bool:
+        """
+        Get the error of the classifier at the given observation.
+
+        :param index: the index of the observation, must be after the reset
+        :return: True if the classifier misclassified the observation, else False
+        """
+        while self.start + len(self.errors) <= index:
+            x, y = self.rows[self.start + len(self.errors)]
+            self.errors.append(self.classifier.predict_one(x) != y)
+            self.classifier.learn_one(x, y)
+        return bool(self.errors[index - self.start])
+
+
+class ErrorStreamCache:
+    """
+    The observations of a data stream and the error streams of classifiers replaced at different observations. Runs
+    of supervised detectors share the error stream as long as they replaced the classifier at the same observations.
+    The cache holds all observations and at most max_error_streams error streams, each consisting of a classifier and
+    up to one byte per observation. The least recently used error stream is evicted first and computed again if it
+    is requested later, which does not change the errors.
+    """
+
+    def __init__(self, stream, max_error_streams: int = 16):
+        """
+        Init a new ErrorStreamCache by iterating the data stream once.
+
+        :param stream: the data stream
+        :param max_error_streams: the maximum number of cached error streams
+        """
+        if max_error_streams < 1:
+            raise ValueError("max_error_streams must be at least 1")
+        self.max_error_streams = max_error_streams
+        self.rows = []
+        drifts = []
+        for x, y, drift in stream:
+            self.rows.append((x, y))
+            drifts.append(drift)
+        self.drifts = np.array(drifts, dtype=bool)
+        self.error_streams = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, reset: int) -> ErrorStream:
+        """
+        Get the error stream of the classifier replaced at the given observation.
+
+        :param reset: the index of the observation, -1 for the initial classifier
+        :return: the error stream
+        """
+        if reset in self.error_streams:
+            self.error_streams.move_to_end(reset)
+        else:
+            self.error_streams[reset] = ErrorStream(self.rows, reset)
+            if len(self.error_streams) > self.max_error_streams:
+                self.error_streams.popitem(last=False)
+        return self.error_streams[reset]
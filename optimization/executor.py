@@ -0,0 +1,86 @@
+"""This module provides the execution of optimization jobs in a pool of worker processes."""
+
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+# the optimizer and stream of a worker process, set once by the initializer instead of being pickled with every job
+_worker_state = {}
+
+# modules imported once per worker process, so jobs do not pay for the imports
+WARM_MODULES = [
+    "sklearn.linear_model",
+    "sklearn.model_selection",
+    "sklearn.metrics",
+    "river.tree",
+    "river.drift",
+]
+
+
+def execute(optimizer, stream, configs: list[dict], workers: int = 1) -> Iterator:
+    """
+    Execute a job for each of the given configurations and yield the results in the order of the configurations. The
+    results are yielded as soon as they and all previous results are complete, so the caller can process and release
+    each result while later jobs are still running. Each worker receives its own copy of the stream and runs whichever jobs it is assigned, so multiple workers require a
+    stream which replays identical data on every iteration, e.g. a materialized stream. Then, as the seeds are part of
+    the configurations, the results neither depend on the number of workers nor on the order in which the jobs
+    complete.
+
+    :param optimizer: the optimizer providing run_job(stream, config)
+    :param stream: the data stream
+    :param configs: the configurations including their seeds
+    :param workers: the number of worker processes, 1 runs the jobs in the current process
+    :return: an iterator over the results of the jobs
+    """
+    if workers > 1 and not getattr(stream, "replays", False):
+        raise ValueError(
+            "Multiple workers require a stream which replays identical data on every iteration, e.g. a materialized "
+            "stream"
+        )
+    return _iter_results(optimizer, stream, configs, workers)
+
+
+def _iter_results(optimizer, stream, configs: list[dict], workers: int) -> Iterator:
+    """
+    Run the jobs of execute and yield their results in the order of the configurations.
+
+    :param optimizer: the optimizer providing run_job(stream, config)
+    :param stream: the data stream
+    :param configs: the configurations including their seeds
+    :param workers: the number of worker processes, 1 runs the jobs in the current process
+    :return: an iterator over the results of the jobs
+    """
+    if workers == 1:
+        for config in configs:
+            yield optimizer.run_job(stream, config)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=(optimizer, stream),
+    ) as executor:
+        # map yields lazily in order and releases each result once it was consumed
+        yield from executor.map(_run_job, configs)
+
+
+def _initialize_worker(optimizer, stream):
+    """
+    Initialize a worker process with the optimizer and stream and import the heavy modules.
+
+    :param optimizer: the optimizer
+    :param stream: the data stream
+    """
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+    _worker_state["optimizer"] = optimizer
+    _worker_state["stream"] = stream
+
+
+def _run_job(config: dict):
+    """
+    Run a job in a worker process.
+
+    :param config: the configuration
+    :return: the result of the job
+    """
+    return _worker_state["optimizer"].run_job(_worker_state["stream"], config)
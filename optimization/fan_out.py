@@ -0,0 +1,178 @@
+"""This module provides the evaluation of many detector configurations in a single pass over a data stream."""
+
+import math
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from detectors.buffer import SharedHistory
+from metrics.aggregation import ResponseAggregator
+from metrics.events import Events
+from metrics.online import OnlineEvaluator
+from .executor import execute
+from .model_optimizer import ModelOptimizer
+from .result_store import ResultStore
+
+
+class FanOutEvaluator:
+    """
+    FanOutEvaluator evaluates the jobs of multiple optimizers, i.e. all runs of all configurations, in a single pass
+    over a data stream. Each block of observations is fed to all detectors, so the stream is generated or parsed and
+    converted only once. Detectors whose data windows hold the most recent observations share one history of the
+    stream instead of keeping their own copies.
+    """
+
+    def __init__(self, optimizers: list[ModelOptimizer]):
+        """
+        Init a new FanOutEvaluator. The observations are passed to the detectors in blocks of the block size of the
+        optimizers.
+
+        :param optimizers: the optimizers, which must support fan-out and share their block size
+        """
+        for optimizer in optimizers:
+            if not optimizer.supports_fan_out:
+                raise ValueError(f"{optimizer.name} does not support fan-out")
+        if len({optimizer.block_size for optimizer in optimizers}) > 1:
+            raise ValueError("The optimizers must share their block size")
+        self.optimizers = optimizers
+        self.block_size = optimizers[0].block_size if optimizers else None
+
+    def evaluate(
+        self,
+        stream,
+        verbose=False,
+        workers: int = 1,
+        result_store: Optional[ResultStore] = None,
+        aggregator: Optional[Callable[[], ResponseAggregator]] = None,
+    ) -> list[dict[str, list]]:
+        """
+        Evaluate all jobs of the optimizers on the given data stream. With multiple workers, the jobs are split into
+        contiguous groups and each worker makes a single pass with a group. The results are collected group by group
+        in the order of the jobs, so each group is released once it was collected.
+
+        :param stream: the data stream, which must replay identical data on every iteration
+        :param verbose: print the currently evaluated models and their configs
+        :param workers: the number of worker processes
+        :param result_store: the store of previous results, only used for streams providing a fingerprint
+        :param aggregator: a callable creating the aggregator of the runs of each configuration, see
+            ModelOptimizer.optimize
+        :return: the results of each optimizer in the format of ModelOptimizer.optimize
+        """
+        all_configs = []
+        all_descriptions = []
+        all_missing = []
+        jobs = []
+        for i, optimizer in enumerate(self.optimizers):
+            optimizer.verbose = verbose
+            configs = optimizer.get_configs()
+            n_configs = len(configs) // optimizer.n_runs
+            runs = [j // n_configs for j in range(len(configs))]
+            descriptions, missing = optimizer.get_missing_jobs(
+                stream, configs, runs, result_store
+            )
+            all_configs.append(configs)
+            all_descriptions.append(descriptions)
+            all_missing.append(missing)
+            jobs += [(i, configs[j]) for j in missing]
+        group_size = math.ceil(len(jobs) / workers)
+        groups = [
+            jobs[start : start + group_size]
+            for start in range(0, len(jobs), max(1, group_size))
+        ]
+        # the results of the jobs in their order, which is the order of the optimizers
+        computed = _drain(execute(self, stream, groups, workers=workers))
+        all_results = []
+        for optimizer, configs, descriptions, missing in zip(
+            self.optimizers, all_configs, all_descriptions, all_missing
+        ):
+            job_results = optimizer.merge_job_results(
+                descriptions, missing, computed, result_store
+            )
+            all_results.append(
+                optimizer.collect_results(configs, job_results, aggregator)
+            )
+        return all_results
+
+    def run_job(self, stream, jobs: list[tuple[int, dict]]) -> list[dict]:
+        """
+        Run the given jobs in a single pass over the data stream.
+
+        :param stream: the data stream
+        :param jobs: tuples containing the index of the optimizer and the configuration
+        :return: the results of the jobs
+        """
+        history = SharedHistory()
+        states = []
+        shares_history = False
+        for i, config in jobs:
+            state = self.optimizers[i].init_job(config)
+            if not self.optimizers[i].requires_labels and hasattr(
+                state, "share_history"
+            ):
+                shares_history |= state.share_history(history)
+            states.append(state)
+        requires_labels = any(self.optimizers[i].requires_labels for i, _ in jobs)
+        evaluators = [OnlineEvaluator() for _ in jobs]
+        predictions = [Events() for _ in jobs]
+        detection_times = np.zeros(len(jobs))
+        for features, drifts, rows in self._iter_blocks(stream, requires_labels):
+            if shares_history:
+                history.extend(features)
+            for j, ((i, _), state) in enumerate(zip(jobs, states)):
+                start_time = time.perf_counter()
+                detections = self.optimizers[i].update_job(state, features, rows)
+                detection_times[j] += time.perf_counter() - start_time
+                predictions[j].extend(detections)
+                evaluators[j].update_many(drifts, detections)
+        return [
+            ModelOptimizer.get_result(evaluator, job_predictions, detection_time)
+            for evaluator, job_predictions, detection_time in zip(
+                evaluators, predictions, detection_times
+            )
+        ]
+
+    def _iter_blocks(self, stream, requires_labels: bool):
+        """
+        Iterate over the given data stream in blocks. If labels are required, the stream is iterated observation by
+        observation and the observations are kept in addition to the features.
+
+        :param stream: the data stream
+        :param requires_labels: True if the observations and labels are required
+        :return: tuples containing the features with shape (block_size, n_features), the drift labels and the
+            observations as (x, y) tuples or None
+        """
+        if not requires_labels and hasattr(stream, "iter_blocks"):
+            for features, drifts in stream.iter_blocks(self.block_size):
+                yield features, drifts, None
+            return
+        features = []
+        drifts = []
+        rows = []
+        for x, y, drift in stream:
+            features.append(list(x.values()) if isinstance(x, dict) else x)
+            drifts.append(drift)
+            rows.append((x, y))
+            if len(rows) == self.block_size:
+                yield np.array(features, dtype=float), np.array(
+                    drifts, dtype=bool
+                ), rows
+                features = []
+                drifts = []
+                rows = []
+        if rows:
+            yield np.array(features, dtype=float), np.array(drifts, dtype=bool), rows
+
+
+def _drain(groups):
+    """
+    Yield the results of the given groups one by one, removing each result from its group, so it is released as soon
+    as it was processed.
+
+    :param groups: the results of each group
+    :return: the results
+    """
+    for group in groups:
+        group.reverse()
+        while group:
+            yield group.pop()
@@ -1,11 +1,19 @@
+import itertools
+import time
 from collections import defaultdict
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Iterator, Optional
 
+import numpy as np
 from river.tree import HoeffdingTreeClassifier
 
-from metrics.eval import evaluate
+from metrics.aggregation import ResponseAggregator
+from metrics.events import Events
+from metrics.online import OnlineEvaluator
 from .config_generator import ConfigGenerator
+from .error_stream import ErrorStreamCache
+from .executor import execute
 from .parameter import Parameter
+from .result_store import ResultStore
 
 
 class ModelOptimizer:
@@ -13,6 +21,11 @@ class ModelOptimizer:
     ModelOptimizer provides methods to test different configurations of a given unsupervised concept drift detector.
     """
 
+    # the labels of the observations are passed to update_job
+    requires_labels = False
+    # the jobs are independent of each other, hence they can be evaluated in a single pass by the FanOutEvaluator
+    supports_fan_out = True
+
     def __init__(
         self,
         base_model: callable,
@@ -20,6 +33,9 @@ class ModelOptimizer:
         n_runs: int,
         name: str = "",
         seeds: Optional[Iterable] = None,
+        block_size: int = 1000,
+        sampling: str = "grid",
+        budget: Optional[int] = None,
     ):
         """
         Init a new ModelOptimizer.
@@ -29,45 +45,286 @@ class ModelOptimizer:
         :param n_runs: the number of test runs for each configuration
         :param name: the name of the model under test
         :param seeds: the seeds or None
+        :param block_size: the number of observations passed to the detector at once
+        :param sampling: the sampling of the configurations, see ConfigGenerator
+        :param budget: the number of sampled configurations
         """
         self.base_model = base_model
-        self.configs = ConfigGenerator(parameters, seeds=seeds)
+        self.configs = ConfigGenerator(
+            parameters, seeds=seeds, sampling=sampling, budget=budget
+        )
         self.n_runs = n_runs
         self.name = name
+        self.block_size = block_size
+        self.verbose = False
+
+    def get_configs(self) -> list[dict]:
+        """
+        Get the configurations of all runs in the order of a serial execution. The seeds are assigned here, so every
+        job knows its seed before it is executed.
 
-    def _model_generator(self):
+        :return: the configurations
         """
-        A generator that yields initialized models using configurations provided by the ConfigGenerator.
+        return [
+            config
+            for run in range(self.n_runs)
+            for config in self.configs.iter_run(run)
+        ]
 
-        :return: the initialized models
+    def _get_model(self, config: dict):
         """
-        for config in self.configs:
-            yield self.base_model(**config), config
+        Init the model with the given configuration.
 
-    def optimize(self, stream, experiment_name, verbose=False) -> dict[str, list]:
+        :param config: the configuration
+        :return: the model
+        """
+        return self.base_model(**config)
+
+    def optimize(
+        self,
+        stream,
+        experiment_name,
+        verbose=False,
+        workers: int = 1,
+        result_store: Optional[ResultStore] = None,
+        aggregator: Optional[Callable[[], ResponseAggregator]] = None,
+    ) -> dict[str, list]:
         """
         Optimize the model on the given data stream and log the results using the ExperimentLogger.
 
         :param stream: the data stream
         :param experiment_name: the name of the experiment
         :param verbose: print the currently optimized model and its config
+        :param workers: the number of worker processes executing the runs and configurations
+        :param result_store: the store of previous results, only used for streams providing a fingerprint, which must
+            replay identical data on every iteration
+        :param aggregator: a callable creating the aggregator of the runs of each configuration, e.g.
+            metrics.aggregation.ResponseAggregator, or None to keep the scores of all runs in lists. Each result is
+            added to its aggregator as soon as it is available and released afterwards.
         :return: a dict containing the predictive results
         """
-        results = defaultdict(list)
-        for run in range(self.n_runs):
-            for model, config in self._model_generator():
-                if verbose:
-                    print(f"{model}: {config}")
-                ground_truth = []
-                predictions = []
-                for x, y, drift in stream:
-                    prediction = model.update(x)
-                    predictions.append(prediction)
-                    ground_truth.append(drift)
-                metrics = evaluate(ground_truth, predictions)
-                results[self._config_to_string(config)].append(metrics)
+        self.verbose = verbose
+        configs = self.get_configs()
+        n_configs = len(configs) // self.n_runs
+        runs = [i // n_configs for i in range(len(configs))]
+        job_results = self._run_jobs(stream, configs, runs, workers, result_store)
+        return self.collect_results(configs, job_results, aggregator)
+
+    def collect_results(
+        self,
+        configs: list[dict],
+        job_results: Iterable[dict],
+        aggregator: Optional[Callable[[], ResponseAggregator]] = None,
+    ) -> dict:
+        """
+        Collect the scores of the jobs by configuration, consuming the results one by one.
+
+        :param configs: the configurations of the jobs
+        :param job_results: the results of the jobs in the order of the configurations
+        :param aggregator: a callable creating the aggregator of the runs of each configuration, or None
+        :return: a dict containing a list of the scores or an aggregator of each configuration
+        """
+        if aggregator is None:
+            results = defaultdict(list)
+            for config, job_result in zip(configs, job_results):
+                results[self._config_to_string(config)].append(job_result["scores"])
+            return results
+        results = defaultdict(aggregator)
+        for config, job_result in zip(configs, job_results):
+            results[self._config_to_string(config)].add(job_result["scores"])
         return results
 
+    def _run_jobs(
+        self,
+        stream,
+        configs: list[dict],
+        runs: list[int],
+        workers: int = 1,
+        result_store: Optional[ResultStore] = None,
+    ) -> Iterator[dict]:
+        """
+        Run a job for each configuration, loading the results already contained in the result store.
+
+        :param stream: the data stream
+        :param configs: the configurations including their seeds
+        :param runs: the run index of each configuration
+        :param workers: the number of worker processes
+        :param result_store: the store of previous results, only used for streams providing a fingerprint
+        :return: an iterator over the results in the order of the configurations
+        """
+        descriptions, missing = self.get_missing_jobs(
+            stream, configs, runs, result_store
+        )
+        computed = execute(self, stream, [configs[i] for i in missing], workers=workers)
+        return self.merge_job_results(descriptions, missing, computed, result_store)
+
+    def get_missing_jobs(
+        self,
+        stream,
+        configs: list[dict],
+        runs: list[int],
+        result_store: Optional[ResultStore] = None,
+    ) -> (list[Optional[dict]], list[int]):
+        """
+        Describe the jobs and determine which of them are not contained in the result store.
+
+        :param stream: the data stream
+        :param configs: the configurations including their seeds
+        :param runs: the run index of each configuration
+        :param result_store: the store of previous results, only used for streams providing a fingerprint
+        :return: a tuple containing the description of each job (None without a result store or if its result is not
+            reproducible) and the indices of the missing jobs
+        """
+        descriptions = [None] * len(configs)
+        if result_store is not None and hasattr(stream, "fingerprint"):
+            stream_fingerprint = stream.fingerprint()
+            descriptions = [
+                (
+                    result_store.describe(
+                        stream_fingerprint,
+                        self._get_job_kind(),
+                        self.base_model,
+                        config,
+                        run,
+                    )
+                    if result_store.is_reproducible(config)
+                    else None
+                )
+                for config, run in zip(configs, runs)
+            ]
+        missing = [
+            i
+            for i, description in enumerate(descriptions)
+            if description is None
+            or result_store.get_key(description) not in result_store
+        ]
+        return descriptions, missing
+
+    def _get_job_kind(self) -> str:
+        """
+        Get the kind of jobs run by this optimizer as part of their description in the result store.
+
+        :return: the kind of jobs
+        """
+        return type(self).__name__
+
+    @staticmethod
+    def merge_job_results(
+        descriptions: list[Optional[dict]],
+        missing: list[int],
+        computed: Iterable[dict],
+        result_store: Optional[ResultStore] = None,
+    ) -> Iterator[dict]:
+        """
+        Merge the computed results of the missing jobs with the stored results of all other jobs. Each computed result
+        is saved in the result store as soon as it is merged, and the stored results are loaded when they are merged.
+
+        :param descriptions: the description of each job
+        :param missing: the indices of the missing jobs
+        :param computed: the results of the missing jobs in their order, only as many are consumed as jobs are missing
+        :param result_store: the store of previous results
+        :return: an iterator over the results of all jobs
+        """
+        missing = set(missing)
+        computed = iter(computed)
+        for i, description in enumerate(descriptions):
+            if i in missing:
+                job_result = next(computed)
+                if description is not None:
+                    result_store.save(
+                        result_store.get_key(description), job_result, description
+                    )
+            else:
+                job_result = result_store.load(result_store.get_key(description))
+            yield job_result
+
+    def run_job(self, stream, config: dict) -> dict:
+        """
+        Run the model with the given configuration once on the data stream.
+
+        :param stream: the data stream
+        :param config: the configuration
+        :return: the result containing the detection indices, the evaluated scores and the detection time in seconds
+        """
+        job = self.init_job(config)
+        evaluator = OnlineEvaluator()
+        predictions = Events()
+        detection_time = 0.0
+        for features, drifts in self._iter_blocks(stream):
+            start_time = time.perf_counter()
+            detections = self.update_job(job, features)
+            detection_time += time.perf_counter() - start_time
+            predictions.extend(detections)
+            evaluator.update_many(drifts, detections)
+        return self.get_result(evaluator, predictions, detection_time)
+
+    def init_job(self, config: dict):
+        """
+        Init the state of a job, which is updated block by block.
+
+        :param config: the configuration
+        :return: the state of the job
+        """
+        model = self._get_model(config)
+        if self.verbose:
+            print(f"{model}: {config}")
+        return model
+
+    def update_job(self, job, features: np.ndarray, rows: Optional[list] = None):
+        """
+        Update a job with a block of observations.
+
+        :param job: the state of the job
+        :param features: the features with shape (n_observations, n_features)
+        :param rows: the observations as (x, y) tuples, only required by supervised detectors
+        :return: a boolean array, True where a drift was detected
+        """
+        return job.update_many(features)
+
+    @staticmethod
+    def get_result(
+        evaluator: OnlineEvaluator, predictions: Events, detection_time: float
+    ) -> dict:
+        """
+        Get the result of a job.
+
+        :param evaluator: the evaluator updated with the drift labels and predictions of the whole stream
+        :param predictions: the predictions
+        :param detection_time: the time spent updating the detector in seconds
+        :return: the result containing the detection indices, the evaluated ResponseTable and the detection time in
+            seconds
+        """
+        return {
+            "detections": predictions.get_indices(),
+            "scores": evaluator.get_table(),
+            "time": detection_time,
+        }
+
+    def _iter_blocks(self, stream):
+        """
+        Iterate over the given data stream in blocks of block_size observations. Streams providing iter_blocks generate
+        the blocks natively, other streams are grouped observation by observation.
+
+        :param stream: the data stream
+        :return: tuples containing the features with shape (block_size, n_features) and the drift labels
+        """
+        if hasattr(stream, "iter_blocks"):
+            yield from stream.iter_blocks(self.block_size)
+            return
+        features = []
+        drifts = []
+        for x, y, drift in stream:
+            if isinstance(x, dict):
+                x = list(x.values())
+            features.append(x)
+            drifts.append(drift)
+            if len(features) == self.block_size:
+                yield np.array(features, dtype=float), np.array(drifts, dtype=bool)
+                features = []
+                drifts = []
+        if features:
+            yield np.array(features, dtype=float), np.array(drifts, dtype=bool)
+
     @staticmethod
     def _config_to_string(config):
         """
@@ -87,6 +344,8 @@ class SupervisedModelOptimizer(ModelOptimizer):
     detector.
     """
 
+    requires_labels = True
+
     def __init__(
         self,
         base_model: callable,
@@ -94,15 +353,32 @@ class SupervisedModelOptimizer(ModelOptimizer):
         n_runs: int,
         name: str = "",
         seeds: Optional[list[int]] = None,
+        sampling: str = "grid",
+        budget: Optional[int] = None,
+        error_mode: str = "live",
+        max_error_streams: int = 16,
     ):
         """
         Init a new SupervisedModelOptimizer instance
 
+        The error mode decides how the errors of the classifier are obtained. In "live" mode, every run trains its own
+        classifier. In "exact" mode, the errors are cached per stream and shared by all runs as long as they replaced
+        the classifier at the same observations, which yields the same results as "live". In "no reset" mode, the
+        classifier is never replaced and all runs share one error sequence, which approximates the results.
+
+        The cached modes keep all observations of the stream as Python objects in memory, in addition to up to
+        max_error_streams classifiers and their errors, see ErrorStreamCache. Runs detecting drifts at many different
+        observations evict and recompute error streams, trading time for bounded memory.
+
         :param base_model: a callable of the detector under test
         :param parameters: the configuration parameters
         :param n_runs: the number of test runs for each configuration
         :param name: the name of the model under test
         :param seeds: the seeds or None
+        :param sampling: the sampling of the configurations, see ConfigGenerator
+        :param budget: the number of sampled configurations
+        :param error_mode: the error mode, either "live", "exact" or "no reset"
+        :param max_error_streams: the maximum number of cached error streams in "exact" mode
         """
         super().__init__(
             base_model=base_model,
@@ -110,44 +386,146 @@ class SupervisedModelOptimizer(ModelOptimizer):
             n_runs=n_runs,
             name=name,
             seeds=seeds,
+            sampling=sampling,
+            budget=budget,
         )
-        self.classifier = None
+        if error_mode not in ("live", "exact", "no reset"):
+            raise ValueError(f"Unknown error mode: {error_mode}")
+        self.error_mode = error_mode
+        self.max_error_streams = max_error_streams
+        # cached errors are shared within an optimizer, so there is nothing to gain from a single pass
+        self.supports_fan_out = error_mode == "live"
+        self.error_cache = None
 
-    def _model_generator(self):
+    def _get_model(self, config: dict):
         """
-        A generator that yields initialized models using configurations provided by the ConfigGenerator.
+        Init the model with the given configuration. Supervised detectors do not take a seed.
 
-        :return: the initialized models
+        :param config: the configuration
+        :return: the model
         """
-        for config in self.configs:
-            config.pop("seed")
-            yield self.base_model(**config), config
+        config = {key: value for key, value in config.items() if key != "seed"}
+        return self.base_model(**config)
 
-    def optimize(self, stream, experiment_name, verbose=False) -> dict[str, list]:
+    def run_job(self, stream, config: dict) -> dict:
         """
-        Optimize the model on the given data stream
+        Run the model with the given configuration once on the data stream, retraining the classifier after each
+        detected drift.
 
         :param stream: the data stream
-        :param experiment_name: the name of the experiment
-        :param verbose: print the currently optimized model and its config
-        :return: a dict containing the predictive results
+        :param config: the configuration
+        :return: the result containing the detection indices, the evaluated scores and the detection time in seconds
         """
-        results = defaultdict(list)
-        for run in range(self.n_runs):
-            for model, config in self._model_generator():
-                self.classifier = HoeffdingTreeClassifier()
-                if verbose:
-                    print(f"{model}: {config}")
-                ground_truth = []
-                predictions = []
-                for x, y, drift in stream:
-                    y_pred = self.classifier.predict_one(x)
-                    model.update(y_pred != y)
-                    if model.drift_detected:
-                        self.classifier = HoeffdingTreeClassifier()
-                    predictions.append(model.drift_detected)
-                    ground_truth.append(drift)
-                    self.classifier.learn_one(x, y)
-                metrics = evaluate(ground_truth, predictions)
-                results[self._config_to_string(config)].append(metrics)
-        return results
+        if self.error_mode != "live":
+            return self._run_cached_job(stream, config)
+        job = self.init_job(config)
+        evaluator = OnlineEvaluator()
+        predictions = Events()
+        detection_time = 0.0
+        observations = iter(stream)
+        while True:
+            block = list(itertools.islice(observations, self.block_size))
+            if not block:
+                break
+            start_time = time.perf_counter()
+            detections = self.update_job(job, None, [(x, y) for x, y, _ in block])
+            detection_time += time.perf_counter() - start_time
+            predictions.extend(detections)
+            evaluator.update_many([drift for _, _, drift in block], detections)
+        return self.get_result(evaluator, predictions, detection_time)
+
+    def __getstate__(self):
+        # every worker process builds its own error cache
+        state = self.__dict__.copy()
+        state["error_cache"] = None
+        return state
+
+    def _run_cached_job(self, stream, config: dict) -> dict:
+        """
+        Run the model with the given configuration once on the cached errors of the data stream. In "exact" mode, the
+        errors of a classifier replaced at the detected drift are used after each detected drift.
+
+        :param stream: the data stream
+        :param config: the configuration
+        :return: the result containing the detection indices, the evaluated scores and the detection time in seconds
+        """
+        if self.error_cache is None or self.error_cache[0] is not stream:
+            self.error_cache = (
+                stream,
+                ErrorStreamCache(stream, self.max_error_streams),
+            )
+        cache = self.error_cache[1]
+        model = self._get_model(config)
+        if self.verbose:
+            print(f"{model}: {config}")
+        errors = cache.get(-1)
+        evaluator = OnlineEvaluator()
+        predictions = Events()
+        detection_time = 0.0
+        for start in range(0, len(cache), self.block_size):
+            stop = min(start + self.block_size, len(cache))
+            detections = np.zeros(stop - start, dtype=bool)
+            start_time = time.perf_counter()
+            for i in range(start, stop):
+                model.update(errors[i])
+                if model.drift_detected and self.error_mode == "exact":
+                    errors = cache.get(i)
+                detections[i - start] = model.drift_detected
+            detection_time += time.perf_counter() - start_time
+            predictions.extend(detections)
+            evaluator.update_many(cache.drifts[start:stop], detections)
+        return self.get_result(evaluator, predictions, detection_time)
+
+    def _get_job_kind(self) -> str:
+        """
+        Get the kind of jobs run by this optimizer as part of their description in the result store. Runs without
+        replacing the classifier differ from the exact results.
+
+        :return: the kind of jobs
+        """
+        if self.error_mode == "no reset":
+            return f"{type(self).__name__} (no reset)"
+        return type(self).__name__
+
+    def init_job(self, config: dict):
+        """
+        Init the state of a job, which consists of the model and the classifier whose errors it monitors.
+
+        :param config: the configuration
+        :return: the state of the job
+        """
+        model = self._get_model(config)
+        if self.verbose:
+            print(f"{model}: {config}")
+        return {"model": model, "classifier": HoeffdingTreeClassifier()}
+
+    def update_job(self, job, features: np.ndarray, rows: Optional[list] = None):
+        """
+        Update a job with a block of observations.
+
+        :param job: the state of the job
+        :param features: the features with shape (n_observations, n_features), unused
+        :param rows: the observations as (x, y) tuples
+        :return: a boolean array, True where a drift was detected
+        """
+        return np.fromiter(
+            (self._update_row(job, x, y) for x, y in rows), dtype=bool, count=len(rows)
+        )
+
+    @staticmethod
+    def _update_row(job: dict, x, y) -> bool:
+        """
+        Update a job with a single observation. The classifier is replaced after a detected drift.
+
+        :param job: the state of the job
+        :param x: the features
+        :param y: the label
+        :return: True if a drift was detected, else False
+        """
+        model = job["model"]
+        y_pred = job["classifier"].predict_one(x)
+        model.update(y_pred != y)
+        if model.drift_detected:
+            job["classifier"] = HoeffdingTreeClassifier()
+        job["classifier"].learn_one(x, y)
+        return model.drift_detected
@@ -1,5 +1,8 @@
+import math
 from typing import Any, List, Optional
 
+import numpy as np
+
 
 class Parameter:
     def __init__(
@@ -11,6 +14,8 @@ class Parameter:
         n_values: Optional[Any] = None,
         step_size: Optional[Any] = None,
         values: Optional[List[Any]] = None,
+        distribution: Optional[str] = None,
+        integer: bool = False,
     ):
         """
         Init a parameter. Not all combinations are possible, check the different generators for supported options.
@@ -21,13 +26,24 @@ class Parameter:
         :param n_values: the number of steps between value and max value
         :param step_size: the step size between values
         :param values: the values as a list
+        :param distribution: the distribution of sampled values between value and max value, either "uniform" or
+            "log uniform", only used by sampling config generators
+        :param integer: round sampled values of the distribution to integers
         """
+        if distribution not in (None, "uniform", "log uniform"):
+            raise ValueError(f"Unknown distribution: {distribution}")
+        if distribution is not None and (value is None or max_value is None):
+            raise ValueError("A distribution requires a value and a max value")
+        if distribution == "log uniform" and value <= 0:
+            raise ValueError("A log uniform distribution requires a positive value")
         self.name = name
         self.value = value
         self.max_value = max_value
         self.n_values = n_values
         self.step_size = step_size
         self.values = values
+        self.distribution = distribution
+        self.integer = integer
 
     def _select_generator(self):
         """
@@ -101,3 +117,30 @@ class Parameter:
 
     def __iter__(self):
         return self._select_generator()
+
+    def sample(self, quantiles: np.ndarray) -> list:
+        """
+        Map the given quantiles of the unit interval to values of the parameter. Parameters with a distribution map
+        them to their distribution, all other parameters select one of their values with equal probability.
+
+        :param quantiles: the quantiles in [0, 1)
+        :return: the values
+        """
+        quantiles = np.asarray(quantiles, dtype=float)
+        if self.distribution is None:
+            values = list(self)
+            indices = np.minimum((quantiles * len(values)).astype(int), len(values) - 1)
+            return [values[i] for i in indices]
+        if self.integer:
+            # each integer between value and max value has equal probability (in log space if log uniform)
+            low, high = self.value - 0.5, self.max_value + 0.5
+        else:
+            low, high = self.value, self.max_value
+        if self.distribution == "log uniform":
+            low, high = math.log(low), math.log(high)
+        values = low + quantiles * (high - low)
+        if self.distribution == "log uniform":
+            values = np.exp(values)
+        if self.integer:
+            values = np.clip(np.round(values), self.value, self.max_value).astype(int)
+        return values.tolist()
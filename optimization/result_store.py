@@ -0,0 +1,133 @@
+"""This module provides a content-addressed store of optimization results on disk."""
+
+from os import path
+
+import numpy as np
+
+from data.cache import get_fingerprint, load_arrays, save_arrays
+from metrics.response_curve import ResponseTable
+
+# the version of the format of saved results, which is part of their key, so results saved in another format are
+# computed again instead of being loaded
+FORMAT_VERSION = 1
+
+
+class ResultStore:
+    """
+    A store of the results of single optimization jobs, i.e. one detector configuration and seed evaluated once on one
+    data stream. Each result is saved under the fingerprint of the stream definition, the optimizer, the detector, the
+    configuration and the run index, so reruns only compute missing results.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Init a new ResultStore.
+
+        :param directory: the directory containing the results
+        """
+        self.directory = directory
+
+    @staticmethod
+    def describe(
+        stream_fingerprint: str,
+        optimizer: str,
+        detector: callable,
+        config: dict,
+        run: int,
+    ) -> dict:
+        """
+        Describe a result by everything that determines it and the format it is saved in.
+
+        :param stream_fingerprint: the fingerprint of the data stream
+        :param optimizer: the name of the optimizer class, as supervised and unsupervised detectors are run differently
+        :param detector: the callable of the detector
+        :param config: the configuration including the seed
+        :param run: the index of the run
+        :return: the description
+        """
+        return {
+            "stream": stream_fingerprint,
+            "optimizer": optimizer,
+            "detector": f"{detector.__module__}.{detector.__qualname__}",
+            "config": config,
+            "run": run,
+            "format": FORMAT_VERSION,
+        }
+
+    @staticmethod
+    def is_reproducible(config: dict) -> bool:
+        """
+        Check if the result of a job is determined by its description. Detectors using the budget test schedule decide
+        when to test from the wall-clock time, so their detections depend on the load of the machine and are not
+        stored.
+
+        :param config: the configuration including the seed
+        :return: True if the result can be stored, else False
+        """
+        return config.get("test_schedule") != "budget"
+
+    @staticmethod
+    def get_key(description: dict) -> str:
+        """
+        Get the key of a result.
+
+        :param description: the description of the result
+        :return: the key
+        """
+        return get_fingerprint(description)
+
+    def __contains__(self, key: str) -> bool:
+        return path.exists(self._get_path(key))
+
+    def load(self, key: str) -> dict:
+        """
+        Load the result with the given key.
+
+        :param key: the key
+        :return: the result containing the detection indices, the ResponseTable and the time in seconds
+        """
+        arrays, metadata = load_arrays(self._get_path(key))
+        scores = ResponseTable(
+            np.array(arrays["deltas"]),
+            {metric: np.array(arrays[metric]) for metric in metadata["metrics"]},
+            metadata["stop"],
+        )
+        return {
+            "detections": np.array(arrays["detections"]),
+            "scores": scores,
+            "time": metadata["time"],
+        }
+
+    def save(self, key: str, result: dict, description: dict):
+        """
+        Save the given result under the given key.
+
+        :param key: the key
+        :param result: the result containing the detection indices, the ResponseTable and the time in seconds
+        :param description: a description of the result stored alongside for inspection
+        """
+        scores = result["scores"]
+        save_arrays(
+            self._get_path(key),
+            {
+                "detections": np.asarray(result["detections"], dtype=np.int64),
+                "deltas": scores.deltas,
+                **scores.columns,
+            },
+            {
+                "time": result["time"],
+                "stop": scores.stop,
+                "metrics": list(scores.columns),
+                "description": description,
+            },
+        )
+
+    def _get_path(self, key: str) -> str:
+        """
+        Get the directory of the result with the given key. The results are spread over subdirectories by the first
+        two characters of their key.
+
+        :param key: the key
+        :return: the directory
+        """
+        return path.join(self.directory, key[:2], key)
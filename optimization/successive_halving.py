@@ -0,0 +1,232 @@
+"""This module provides a successive-halving search over the configurations of a detector."""
+
+import itertools
+import math
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from data.cache import get_fingerprint
+from metrics.aggregation import ResponseAggregator
+from metrics.response_curve import to_response_curve
+from .model_optimizer import ModelOptimizer
+from .parameter import Parameter
+from .result_store import ResultStore
+
+
+class SuccessiveHalvingOptimizer(ModelOptimizer):
+    """
+    SuccessiveHalvingOptimizer searches the configurations of an unsupervised concept drift detector by successive
+    halving. All configurations are first run on a short prefix of the data stream and ranked by the mean F1 score up
+    to a horizon of Delta_max. Only the best proportion of configurations survives each round, while the prefix grows
+    and more seeds are run, until the survivors are run n_runs times on the whole data stream.
+    """
+
+    # the jobs of later rounds depend on the results of earlier rounds
+    supports_fan_out = False
+
+    def __init__(
+        self,
+        base_model: callable,
+        parameters: list[Parameter],
+        n_runs: int,
+        name: str = "",
+        seeds: Optional[Iterable] = None,
+        block_size: int = 1000,
+        sampling: str = "grid",
+        budget: Optional[int] = None,
+        min_samples: int = 50_000,
+        reduction_factor: int = 3,
+        horizon: int = 1000,
+    ):
+        """
+        Init a new SuccessiveHalvingOptimizer.
+
+        :param base_model: a callable of the detector under test
+        :param parameters: the configuration parameters
+        :param n_runs: the number of test runs of each configuration surviving until the last round
+        :param name: the name of the model under test
+        :param seeds: the seeds or None
+        :param block_size: the number of observations passed to the detector at once
+        :param sampling: the sampling of the configurations, see ConfigGenerator
+        :param budget: the number of sampled configurations
+        :param min_samples: the length of the prefix of the data stream in the first round
+        :param reduction_factor: the factor by which the prefix grows and the number of configurations shrinks in
+            each round
+        :param horizon: the largest Delta_max considered when ranking configurations
+        """
+        super().__init__(
+            base_model=base_model,
+            parameters=parameters,
+            n_runs=n_runs,
+            name=name,
+            seeds=seeds,
+            block_size=block_size,
+            sampling=sampling,
+            budget=budget,
+        )
+        self.min_samples = min_samples
+        self.reduction_factor = reduction_factor
+        self.horizon = horizon
+        self.history = []
+
+    def optimize(
+        self,
+        stream,
+        experiment_name,
+        verbose=False,
+        workers: int = 1,
+        result_store: Optional[ResultStore] = None,
+        aggregator: Optional[Callable[[], ResponseAggregator]] = None,
+    ) -> dict[str, list]:
+        """
+        Search the configurations on the given data stream. The runs of a configuration use the same seeds in every
+        round. The ranking of each round is recorded in history.
+
+        :param stream: the data stream, must provide iter_blocks and its number of observations
+        :param experiment_name: the name of the experiment
+        :param verbose: print the currently optimized model and its config as well as the ranking of each round
+        :param workers: the number of worker processes executing the runs and configurations
+        :param result_store: the store of previous results, only used for streams providing a fingerprint
+        :param aggregator: a callable creating the aggregator of the runs of each configuration, see
+            ModelOptimizer.optimize
+        :return: a dict containing the predictive results of the configurations surviving until the last round
+        """
+        self.verbose = verbose
+        self.history = []
+        configs = self.get_configs()
+        n_configs = len(configs) // self.n_runs
+        n_samples = get_n_samples(stream)
+        n_rounds = max(
+            1, math.ceil(math.log(n_samples / self.min_samples, self.reduction_factor))
+        )
+        candidates = list(range(n_configs))
+        for i in range(n_rounds + 1):
+            prefix_len = min(n_samples, self.min_samples * self.reduction_factor**i)
+            n_runs = max(1, self.n_runs // self.reduction_factor ** (n_rounds - i))
+            if prefix_len == n_samples:
+                n_runs = self.n_runs
+            jobs = list(itertools.product(range(n_runs), candidates))
+            job_results = self._run_jobs(
+                StreamPrefix(stream, prefix_len),
+                [configs[run * n_configs + candidate] for run, candidate in jobs],
+                [run for run, _ in jobs],
+                workers,
+                result_store,
+            )
+            if prefix_len == n_samples:
+                return self.collect_results(
+                    [configs[run * n_configs + candidate] for run, candidate in jobs],
+                    job_results,
+                    aggregator,
+                )
+            candidate_scores = defaultdict(list)
+            for (_, candidate), job_result in zip(jobs, job_results):
+                candidate_scores[candidate].append(
+                    get_mean_f1_score(job_result["scores"], self.horizon)
+                )
+            ranking = sorted(
+                candidates, key=lambda candidate: -np.mean(candidate_scores[candidate])
+            )
+            self.history.append(
+                {
+                    "n_samples": prefix_len,
+                    "n_runs": n_runs,
+                    "ranking": [
+                        (
+                            self._config_to_string(configs[candidate]),
+                            float(np.mean(candidate_scores[candidate])),
+                        )
+                        for candidate in ranking
+                    ],
+                }
+            )
+            n_survivors = max(1, math.ceil(len(candidates) / self.reduction_factor))
+            # the survivors keep the order of the grid
+            candidates = sorted(ranking[:n_survivors])
+            if verbose:
+                print(
+                    f"Round {i}: {len(candidates)} of {len(ranking)} configurations survive "
+                    f"{n_runs} runs on {prefix_len} observations"
+                )
+
+
+class StreamPrefix:
+    """
+    A view of the first observations of a data stream.
+    """
+
+    def __init__(self, stream, n_samples: int):
+        """
+        Init a new StreamPrefix.
+
+        :param stream: the data stream, must provide iter_blocks and fingerprint
+        :param n_samples: the number of observations of the prefix
+        """
+        self.stream = stream
+        self.n_samples = n_samples
+        self.name = getattr(stream, "name", "")
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    @property
+    def replays(self) -> bool:
+        return getattr(self.stream, "replays", False)
+
+    def __iter__(self):
+        yield from itertools.islice(self.stream, self.n_samples)
+
+    def iter_blocks(self, block_size: int):
+        """
+        Iterate over the prefix in blocks.
+
+        :param block_size: the number of observations per block, only the last block may be shorter
+        :return: tuples containing the features with shape (block_size, n_features) and the drift labels
+        """
+        n = 0
+        for features, drifts in self.stream.iter_blocks(block_size):
+            if n + len(features) >= self.n_samples:
+                yield features[: self.n_samples - n], drifts[: self.n_samples - n]
+                return
+            yield features, drifts
+            n += len(features)
+
+    def fingerprint(self) -> str:
+        """
+        Get a fingerprint identifying the data of the prefix, the stream must provide a fingerprint.
+
+        :return: the fingerprint
+        """
+        return get_fingerprint(
+            {"stream": self.stream.fingerprint(), "n_samples": self.n_samples}
+        )
+
+
+def get_n_samples(stream) -> int:
+    """
+    Get the number of observations of a data stream.
+
+    :param stream: the data stream
+    :return: the number of observations
+    """
+    if hasattr(stream, "__len__"):
+        return len(stream)
+    if hasattr(stream, "get_n_samples"):
+        return stream.get_n_samples()
+    if getattr(stream, "n_samples", None) is not None:
+        return stream.n_samples
+    raise ValueError("The number of observations of the stream is unknown")
+
+
+def get_mean_f1_score(scores: list, horizon: int) -> float:
+    """
+    Get the mean F1 score for Delta_max from 0 to the horizon, i.e. the normalized area under the F1 curve. Undefined
+    scores count as 0 and the curve is extended by its last score, as it remains constant once every drift is detected.
+
+    :param scores: the ResponseCurve or the F1 scores for increasing Delta_max
+    :param horizon: the largest Delta_max
+    :return: the mean F1 score
+    """
+    return to_response_curve(scores).get_area(horizon + 1) / (horizon + 1)
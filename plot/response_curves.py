@@ -1,13 +1,27 @@
 import numpy as np
-import warnings
 from matplotlib import pyplot as plt
 
+from metrics.aggregation import ResponseAggregator
+from metrics.response_curve import RATIO_METRICS, ResponseCurve, to_response_curve
+
+
+METRIC_LABELS = {
+    "f1": r"$F_1$",
+    "recall": "Recall",
+    "precision": "Precision",
+    "true_positives": "Detected drifts",
+    "false_positives": "False positives",
+    "time_to_detection": "Mean time to detection",
+    "time_to_adaptation": "Mean time to adaptation",
+    "time_to_response": "Mean time to response",
+}
+
 
 def ibm_color_gen():
     yield from ["#648FFF", "#FE6100", "#785EF0", "#DC267F", "#FFB000"]
 
 
-def plot_response_curves(stream_results, stream_name):
+def plot_response_curves(stream_results, stream_name, metric="f1"):
     plt.rcParams.update({"font.size": 18})
     fig = plt.gcf()
     fig.set_size_inches(12, 7.5)
@@ -16,49 +30,56 @@ def plot_response_curves(stream_results, stream_name):
     for detector, results in stream_results.items():
         for key, scores in results.items():
             color = next(colors)
-            if len(scores) > 1:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore", category=RuntimeWarning)
-                    padded_scores = _pad_score(scores)
-                    y_values = np.nanmean(padded_scores, axis=0)
-                    y_interval = 2 * np.nanstd(
-                        padded_scores, axis=0
-                    )  # 95% confidence interval
+            if isinstance(scores, ResponseAggregator):
+                n_runs = scores.n_runs
+                mean_curve = scores.mean(metric)
+                std_curve = scores.std(metric) if n_runs > 1 else None
+            else:
+                curves = [to_response_curve(score, metric) for score in scores]
+                n_runs = len(curves)
+                mean_curve = ResponseCurve.mean(curves) if n_runs > 1 else curves[0]
+                std_curve = ResponseCurve.std(curves) if n_runs > 1 else None
+            x_values, y_values = _get_steps(mean_curve)
+            if n_runs > 1:
+                _, y_interval = _get_steps(std_curve)
+                y_interval = 2 * y_interval  # 95% confidence interval
+                upper_limit = 1 if metric in RATIO_METRICS else None
                 lower_bound = y_values - y_interval
-                clipped_lower_bound = np.clip(lower_bound, 0, 1)
+                clipped_lower_bound = np.clip(lower_bound, 0, upper_limit)
                 upper_bound = y_values + y_interval
-                clipped_upper_bound = np.clip(upper_bound, 0, 1)
+                clipped_upper_bound = np.clip(upper_bound, 0, upper_limit)
                 plt.fill_between(
-                    np.arange(len(y_values)),
+                    x_values,
                     clipped_lower_bound,
                     clipped_upper_bound,
                     alpha=0.2,
                     color=color,
+                    step="post",
                 )
-            else:
-                y_values = scores[0]
             if "," in key:
                 label = f"{detector}({key})"
             else:
                 label = f"{detector}"
-            plt.plot(y_values, label=label, linewidth=2.5, color=color)
+            plt.step(
+                x_values,
+                y_values,
+                where="post",
+                label=label,
+                linewidth=2.5,
+                color=color,
+            )
     plt.xlabel(r"$\Delta_{\mathrm{max}}$")
-    plt.ylabel(r"$F_1$")
+    plt.ylabel(METRIC_LABELS.get(metric, metric))
     plt.legend()
     plt.grid()
     plt.tight_layout()
-    plt.savefig(f"{stream_name}.pdf", format="pdf")
+    file_name = stream_name if metric == "f1" else f"{stream_name}_{metric}"
+    plt.savefig(f"{file_name}.pdf", format="pdf")
     plt.clf()
 
 
-def _pad_score(scores):
-    max_len = max(map(len, scores))
-    padded_scores = []
-    for score in scores:
-        score = np.array(score, dtype=float)
-        padded_scores.append(
-            np.pad(
-                score, (0, max_len - len(score)), "constant", constant_values=(np.nan,)
-            )
-        )
-    return padded_scores
+def _get_steps(curve):
+    # the last step ends at the last Delta_max of the curve
+    x_values = np.append(curve.deltas, curve.stop - 1)
+    y_values = np.append(curve.values, curve.values[-1])
+    return x_values, y_values
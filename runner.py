@@ -1,21 +1,83 @@
 import copy
+import functools
 from collections import defaultdict
+from typing import Optional
 
+from data.cache import materialize
+from data.stream import Stream
+from metrics.aggregation import ResponseAggregator
+from optimization.fan_out import FanOutEvaluator
+from optimization.result_store import ResultStore
 from plot.response_curves import plot_response_curves
 
 
-def run(experiment_name, config):
+def run(
+    experiment_name,
+    config,
+    cache_dir: Optional[str] = None,
+    workers: int = 1,
+    results_dir: Optional[str] = None,
+    fan_out: bool = False,
+    metrics: tuple = ("f1",),
+    keep_curves: bool = False,
+):
     """
     Run the experiment with the given config.
 
     :param experiment_name: the name of the experiment
     :param config: the config of the experiment
+    :param cache_dir: the directory of the stream cache, if given, streams supporting it are materialized once and
+        every run replays identical data
+    :param workers: the number of worker processes executing the runs and configurations of each model, multiple
+        workers require replayable streams, e.g. a cache_dir
+    :param results_dir: the directory of the result store, if given, previously computed results are loaded instead of
+        computed again
+    :param fan_out: evaluate all models supporting it in a single pass over each stream, see FanOutEvaluator
+    :param metrics: the metrics of which the response curves are plotted, see plot_response_curves
+    :param keep_curves: keep the response curves of all runs in addition to their summary, see ResponseAggregator
     """
     print(f"Running experiment {experiment_name}")
+    result_store = ResultStore(results_dir) if results_dir is not None else None
+    # the runs of each configuration are summarized as soon as they finish
+    aggregator = functools.partial(
+        ResponseAggregator, metrics=list(metrics), keep_curves=keep_curves
+    )
     for base_stream in config.streams:
+        if cache_dir is not None and isinstance(base_stream, Stream):
+            base_stream = materialize(base_stream, cache_dir, workers=workers)
+        # a stream that is not materialized continues where the previous run stopped
+        stream_result_store = None if isinstance(base_stream, Stream) else result_store
+        fan_out_results = {}
+        if fan_out:
+            # models passing different block sizes to their detectors are evaluated in separate passes
+            fan_out_models = defaultdict(list)
+            for model in config.models:
+                if model.supports_fan_out:
+                    fan_out_models[model.block_size].append(model)
+            for models in fan_out_models.values():
+                evaluator = FanOutEvaluator(models)
+                all_results = evaluator.evaluate(
+                    base_stream,
+                    verbose=True,
+                    workers=workers,
+                    result_store=stream_result_store,
+                    aggregator=aggregator,
+                )
+                fan_out_results.update(zip(map(id, models), all_results))
         stream_results = defaultdict(dict)
         for model in config.models:
-            stream = copy.copy(base_stream)
-            model_results = model.optimize(stream, experiment_name, verbose=True)
+            if id(model) in fan_out_results:
+                model_results = fan_out_results[id(model)]
+            else:
+                stream = copy.copy(base_stream)
+                model_results = model.optimize(
+                    stream,
+                    experiment_name,
+                    verbose=True,
+                    workers=workers,
+                    result_store=stream_result_store,
+                    aggregator=aggregator,
+                )
             stream_results[model.name].update(model_results)
-        plot_response_curves(stream_results, base_stream.name)
+        for metric in metrics:
+            plot_response_curves(stream_results, base_stream.name, metric)